@@ -0,0 +1,26 @@
+import re
+from functools import lru_cache
+
+import jdatetime
+
+from component.persian_text import normalize_persian
+
+JALALI_FORMAT = '%Y/%m/%d'
+JALALI_DATE_PATTERN = re.compile(r'^(\d{4})[/\-](\d{1,2})[/\-](\d{1,2})$')
+
+
+@lru_cache(maxsize=4096)
+def jalali_date(value):
+    """'1403/01/15' for a Gregorian date; memoised, listings repeat the same few days."""
+    return jdatetime.date.fromgregorian(date=value).strftime(JALALI_FORMAT)
+
+
+def parse_jalali_date(text):
+    """Gregorian date for a Jalali 'YYYY/MM/DD' (or YYYY-MM-DD, Persian digits allowed), None if invalid."""
+    match = JALALI_DATE_PATTERN.match(normalize_persian(text))
+    if not match:
+        return None
+    try:
+        return jdatetime.date(*map(int, match.groups())).togregorian()
+    except ValueError:
+        return None
@@ -0,0 +1,54 @@
+import re
+import unicodedata
+
+ZWNJ = '\u200c'
+
+# Arabic letter variants that users type interchangeably with the Persian ones
+PERSIAN_CHARACTER_MAP = str.maketrans({
+    'ي': 'ی',
+    'ى': 'ی',
+    'ئ': 'ی',
+    'ك': 'ک',
+    'ة': 'ه',
+    'ۀ': 'ه',
+    'أ': 'ا',
+    'إ': 'ا',
+    'ٱ': 'ا',
+    'ؤ': 'و',
+    '\u0640': '',  # tatweel
+    ZWNJ: '',
+    '\u200d': '',  # zero width joiner
+    '\u200f': '',  # right-to-left mark
+    '\u200e': '',  # left-to-right mark
+    **{chr(0x06F0 + i): str(i) for i in range(10)},  # Persian digits
+    **{chr(0x0660 + i): str(i) for i in range(10)},  # Arabic digits
+})
+
+DIACRITICS_PATTERN = re.compile('[\u064b-\u065f\u0670]')  # harakat, superscript alef
+TOKEN_SPLIT_PATTERN = re.compile(r'[\s_\-،,.;:!?؟()\[\]"\'/\\]+')
+KEY_STRIP_PATTERN = re.compile(r'[\s_]+')
+
+
+def normalize_persian(text):
+    """
+    Unify Arabic/Persian letter variants, digits and joiners and drop diacritics,
+    so that visually identical strings compare equal.
+    """
+    if not text:
+        return ''
+    text = unicodedata.normalize('NFKC', str(text))
+    text = DIACRITICS_PATTERN.sub('', text)
+    text = text.translate(PERSIAN_CHARACTER_MAP)
+    return ' '.join(text.lower().split())
+
+
+def tokenize(text):
+    return [token for token in TOKEN_SPLIT_PATTERN.split(normalize_persian(text)) if token]
+
+
+def normalize_key(text):
+    """
+    Exact-match key: the normalised text without spaces or underscores, so that
+    'اسلام‌شهر', 'اسلام شهر' and 'اسلامشهر' share one key.
+    """
+    return KEY_STRIP_PATTERN.sub('', normalize_persian(text))
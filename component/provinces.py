@@ -1,5 +1,6 @@
 import os
 from django.conf import settings
+from component.persian_text import normalize_key
 
 PROVINCE_FILE_PATH = os.path.join(
     settings.BASE_DIR,
@@ -19,4 +20,11 @@ except FileNotFoundError:
         "لطفا از درستی مسیر اطمینان حاصل کنید."
     )
 except Exception as e:
-    raise RuntimeError(f"خطای غیرمنتظره در پردازش فایل: {str(e)}")
\ No newline at end of file
+    raise RuntimeError(f"خطای غیرمنتظره در پردازش فایل: {str(e)}")
+
+PROVINCE_BY_KEY = {normalize_key(value): value for value, label in PROVINCES}
+
+
+def canonical_province(name):
+    """Return the stored spelling of a province/city name, or None if it is unknown."""
+    return PROVINCE_BY_KEY.get(normalize_key(name))
@@ -1,3 +1,5 @@
+from component.persian_text import normalize_key
+
 SKILL = [
     ('مهندسی عمران', 'مهندسی عمران'),
     ('مهندسی_معماری', 'مهندسی معماری'),
@@ -46,4 +48,14 @@ SKILL = [
     ('نصاب_کابینت', 'نصاب کابینت'),
     ('متخصص_بازسازی', 'متخصص بازسازی'),
     ('کارشناس_تخمین_هزینه', 'کارشناس تخمین هزینه'),
-]
\ No newline at end of file
+]
+
+SKILL_BY_KEY = {}
+for value, label in SKILL:
+    SKILL_BY_KEY[normalize_key(label)] = value
+    SKILL_BY_KEY[normalize_key(value)] = value
+
+
+def canonical_skill(text):
+    """Return the stored skill value for a skill value or label, or None if it is unknown."""
+    return SKILL_BY_KEY.get(normalize_key(text))
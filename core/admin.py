@@ -1,6 +1,8 @@
 from django.contrib import admin
 
-from .models import CustomUser,AbstractUser
+from .models import CustomUser,AbstractUser, SmsMessage, StoredFile
 
 admin.site.register(CustomUser)
+admin.site.register(SmsMessage)
+admin.site.register(StoredFile)
 # admin.site.register(AbstractUser)
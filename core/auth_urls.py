@@ -0,0 +1,9 @@
+from rest_framework.routers import DefaultRouter
+
+from .views import CachedUserViewSet
+
+# Same routes as djoser.urls, with the cached user viewset
+router = DefaultRouter()
+router.register('users', CachedUserViewSet)
+
+urlpatterns = router.urls
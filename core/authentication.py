@@ -0,0 +1,109 @@
+import copy
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db.models import F
+from django.utils.functional import SimpleLazyObject, empty
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .models import TOKEN_CLAIM_FIELDS, token_version_cache_key
+
+TOKEN_VERSION_CLAIM = 'token_version'
+# User fields copied into every token, readable on request.user without a query.
+# Changing one of them on a saved user bumps token_version (CustomUser.save).
+USER_CLAIMS = TOKEN_CLAIM_FIELDS
+
+
+def add_user_claims(token, user):
+    for field in USER_CLAIMS:
+        token[field] = getattr(user, field)
+    token[TOKEN_VERSION_CLAIM] = user.token_version
+    return token
+
+
+def tokens_for_user(user):
+    return add_user_claims(RefreshToken.for_user(user), user)
+
+
+def get_token_version(user_id):
+    key = token_version_cache_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        version = get_user_model().objects.filter(pk=user_id).values_list('token_version', flat=True).first()
+        if version is None:
+            return None
+        cache.set(key, version, getattr(settings, 'TOKEN_VERSION_CACHE_TIMEOUT', 60))
+    return version
+
+
+def revoke_user_tokens(user_id):
+    """Invalidate every access and refresh token issued to the user so far."""
+    get_user_model().objects.filter(pk=user_id).update(token_version=F('token_version') + 1)
+    cache.delete(token_version_cache_key(user_id))
+
+
+class LazyTokenUser(SimpleLazyObject):
+    """
+    request.user built from token claims. The CustomUser row is only loaded when
+    something outside the claims is used (other fields, isinstance checks, saving a FK).
+    """
+
+    def __init__(self, user_id, claims):
+        super().__init__(lambda: get_user_model().objects.get(pk=user_id))
+        self.__dict__['_claims'] = {
+            'id': user_id,
+            'pk': user_id,
+            'is_authenticated': True,
+            'is_anonymous': False,
+            **claims,
+        }
+
+    def __getattr__(self, name):
+        claims = self.__dict__.get('_claims', {})
+        if self._wrapped is empty and name in claims:
+            return claims[name]
+        return super().__getattr__(name)
+
+    def __bool__(self):
+        # IsAuthenticated evaluates bool(request.user); answer without loading
+        return True
+
+    def __copy__(self):
+        if self._wrapped is empty:
+            self._setup()
+        return copy.copy(self._wrapped)
+
+    def __deepcopy__(self, memo):
+        if self._wrapped is empty:
+            self._setup()
+        return copy.deepcopy(self._wrapped, memo)
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication without the per-request user SELECT. Revocation is checked
+    against the cached per-user token version; tokens issued before the claims
+    existed fall back to the regular database lookup.
+    """
+
+    def get_user(self, validated_token):
+        if TOKEN_VERSION_CLAIM not in validated_token or any(claim not in validated_token for claim in USER_CLAIMS):
+            return super().get_user(validated_token)
+
+        try:
+            # simplejwt writes the claim as a string; request.user.id must keep the field's type
+            user_id_field = get_user_model()._meta.get_field(api_settings.USER_ID_FIELD)
+            user_id = user_id_field.to_python(validated_token[api_settings.USER_ID_CLAIM])
+        except (KeyError, ValidationError):
+            raise InvalidToken("Token contained no recognizable user identification")
+
+        if get_token_version(user_id) != validated_token[TOKEN_VERSION_CLAIM]:
+            raise InvalidToken("Token has been revoked")
+
+        claims = {field: validated_token[field] for field in USER_CLAIMS}
+        return LazyTokenUser(user_id, claims)
@@ -0,0 +1,86 @@
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.utils import load_backend
+
+from utils.mysql_pool.pool import pool_snapshots
+
+MODES = ('direct', 'persistent', 'pooled')
+MYSQL_ENGINES = ('django.db.backends.mysql', 'utils.mysql_pool')
+
+
+def mode_settings(base, mode):
+    settings_dict = {**base, 'CONN_MAX_AGE': 0, 'CONN_HEALTH_CHECKS': False}
+    if settings_dict['ENGINE'] == 'utils.mysql_pool':
+        settings_dict['ENGINE'] = 'django.db.backends.mysql'
+    if mode == 'persistent':
+        settings_dict.update(CONN_MAX_AGE=600, CONN_HEALTH_CHECKS=True)
+    elif mode == 'pooled':
+        settings_dict['ENGINE'] = 'utils.mysql_pool'
+    return settings_dict
+
+
+class Command(BaseCommand):
+    help = (
+        "Simulate concurrent requests against the database in each connection mode "
+        "(connect, run one query, let Django close or keep the connection) and report req/s."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default')
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--requests', type=int, default=200, help="Requests per thread")
+        parser.add_argument('--sql', default='SELECT 1')
+        parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES))
+
+    def handle(self, *args, **options):
+        base = connections[options['database']].settings_dict
+        self.stdout.write(f"{'mode':<12} {'req/s':>10} {'p50 ms':>8} {'p95 ms':>8}")
+        for mode in options['modes']:
+            if mode == 'pooled' and base['ENGINE'] not in MYSQL_ENGINES:
+                self.stdout.write(f"{mode:<12} skipped: the pool backend requires MySQL")
+                continue
+            throughput, latencies = self.run_mode(mode, base, options)
+            latencies.sort()
+            p50 = latencies[len(latencies) // 2]
+            p95 = latencies[int(len(latencies) * 0.95)]
+            self.stdout.write(f"{mode:<12} {throughput:>10.0f} {p50:>8.2f} {p95:>8.2f}")
+
+        for alias, snapshot in pool_snapshots().items():
+            self.stdout.write(f"pool {alias}: {snapshot}")
+
+    def run_mode(self, mode, base, options):
+        settings_dict = mode_settings(base, mode)
+        backend = load_backend(settings_dict['ENGINE'])
+        alias = f'benchmark-{mode}'
+        latencies = []
+        lock = threading.Lock()
+
+        def worker():
+            # One wrapper per thread, as django.db.connections does
+            wrapper = backend.DatabaseWrapper(settings_dict, alias)
+            timings = []
+            try:
+                for _ in range(options['requests']):
+                    start = time.perf_counter()
+                    wrapper.close_if_unusable_or_obsolete()  # request_started
+                    with wrapper.cursor() as cursor:
+                        cursor.execute(options['sql'])
+                        cursor.fetchall()
+                    wrapper.close_if_unusable_or_obsolete()  # request_finished
+                    timings.append((time.perf_counter() - start) * 1000)
+            finally:
+                wrapper.close()
+            with lock:
+                latencies.extend(timings)
+
+        threads = [threading.Thread(target=worker) for _ in range(options['threads'])]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        return len(latencies) / elapsed, latencies
@@ -0,0 +1,158 @@
+import json
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.models import StoredFile
+from my_profile.models import Profile, Sample_image
+from register_ad.models import RegisterAdImage
+
+# (model, field) pairs whose values are MEDIA_ROOT-relative file names
+REFERENCES = [
+    (RegisterAdImage, 'image'),
+    (Sample_image, 'image'),
+    (Sample_image, 'image_webp'),
+    (Profile, 'profile_picture'),
+    (Profile, 'profile_picture_webp'),
+]
+
+
+def sorted_entries(directory):
+    try:
+        with os.scandir(directory) as it:
+            return iter(sorted(it, key=lambda entry: entry.name))
+    except FileNotFoundError:
+        return iter(())
+
+
+def walk_files(root, start_after=None):
+    """
+    Yield (relative path, stat) for every file below `root` in sorted path order,
+    holding one directory listing per level in memory. With `start_after`,
+    everything up to and including that path is skipped without descending into it.
+    """
+    resume = tuple(start_after.split('/')) if start_after else None
+    stack = [((), sorted_entries(root))]
+    while stack:
+        parts, entries = stack[-1]
+        entry = next(entries, None)
+        if entry is None:
+            stack.pop()
+            continue
+        path = parts + (entry.name,)
+        if entry.is_dir(follow_symlinks=False):
+            if resume is None or path >= resume[:len(path)]:
+                stack.append((path, sorted_entries(entry.path)))
+        elif entry.is_file(follow_symlinks=False):
+            if resume is None or path > resume:
+                yield '/'.join(path), entry.stat()
+
+
+def referenced(names):
+    found = set()
+    for model, field in REFERENCES:
+        found.update(model.objects.filter(**{f'{field}__in': names}).values_list(field, flat=True))
+    return found
+
+
+class Command(BaseCommand):
+    help = (
+        "Find media files that no RegisterAdImage, Sample_image or Profile row points at. "
+        "Reports only unless --delete is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--delete', action='store_true', help="Remove the orphans (default is a dry run).")
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument('--min-age', type=int, default=3600,
+                            help="Ignore files modified in the last N seconds (uploads still being attached).")
+        parser.add_argument('--checkpoint', help="JSON file recording progress, written after every chunk.")
+        parser.add_argument('--resume', action='store_true', help="Continue after the path stored in --checkpoint.")
+
+    def handle(self, *args, **options):
+        root = settings.MEDIA_ROOT
+        checkpoint = options['checkpoint']
+        stats = {'scanned': 0, 'scanned_bytes': 0, 'orphans': 0, 'orphan_bytes': 0, 'deleted': 0, 'last_path': None}
+        if options['resume']:
+            if not checkpoint or not os.path.exists(checkpoint):
+                self.stderr.write("--resume needs an existing --checkpoint file")
+                return
+            with open(checkpoint) as f:
+                stats = json.load(f)
+            self.stdout.write(f"Resuming after {stats['last_path']}")
+
+        cutoff = time.time() - options['min_age']
+        started = time.perf_counter()
+        chunk = []
+        for path, stat in walk_files(root, stats['last_path']):
+            chunk.append((path, stat))
+            if len(chunk) >= options['chunk_size']:
+                self.process_chunk(root, chunk, cutoff, stats, options)
+                self.save_checkpoint(checkpoint, stats)
+                self.report(stats, started, options['verbosity'] >= 2)
+                chunk = []
+        if chunk:
+            self.process_chunk(root, chunk, cutoff, stats, options)
+
+        self.report(stats, started, True)
+        if checkpoint and os.path.exists(checkpoint):
+            os.remove(checkpoint)
+
+    def process_chunk(self, root, chunk, cutoff, stats, options):
+        in_use = referenced([path for path, _ in chunk])
+        orphans = []
+        for path, stat in chunk:
+            stats['scanned'] += 1
+            stats['scanned_bytes'] += stat.st_size
+            if path in in_use or stat.st_mtime > cutoff:
+                continue
+            orphans.append(path)
+            stats['orphans'] += 1
+            stats['orphan_bytes'] += stat.st_size
+            if options['verbosity'] >= 2:
+                self.stdout.write(f"orphan: {path}")
+
+        if options['delete'] and orphans:
+            self.delete_orphans(root, orphans, stats)
+        stats['last_path'] = chunk[-1][0]
+
+    def delete_orphans(self, root, orphans, stats):
+        with transaction.atomic():
+            # Content-addressed files also carry a reference-count row. Locking it makes a
+            # concurrent save of the same content (which takes its reference on that row
+            # and then reuses the file on disk) either finish first and be seen by the
+            # checks below, or wait until the file and the row are gone and write both anew
+            ref_counts = dict(
+                StoredFile.objects.select_for_update().filter(name__in=orphans).values_list('name', 'ref_count')
+            )
+            in_use = referenced(orphans)
+            removable = [path for path in orphans if path not in in_use and not ref_counts.get(path)]
+            for path in removable:
+                try:
+                    os.remove(os.path.join(root, path))
+                    stats['deleted'] += 1
+                except FileNotFoundError:
+                    pass
+            StoredFile.objects.filter(name__in=removable).delete()
+
+    def save_checkpoint(self, checkpoint, stats):
+        if not checkpoint:
+            return
+        tmp_path = f'{checkpoint}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(stats, f)
+        os.replace(tmp_path, checkpoint)
+
+    def report(self, stats, started, always):
+        if not always:
+            return
+        elapsed = time.perf_counter() - started
+        rate = stats['scanned'] / elapsed if elapsed else 0
+        self.stdout.write(
+            f"scanned {stats['scanned']} files ({stats['scanned_bytes'] / 1e6:.1f} MB), "
+            f"orphans {stats['orphans']} ({stats['orphan_bytes'] / 1e6:.1f} MB), "
+            f"deleted {stats['deleted']}, {rate:.0f} files/s"
+        )
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from core.sms_outbox import process_due_messages
+from utils.http_client import latency_snapshots
+
+
+class Command(BaseCommand):
+    help = "Deliver queued SMS messages from the outbox, retrying with backoff and provider failover."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Process one batch and exit.")
+        parser.add_argument('--batch-size', type=int, default=50)
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help="Seconds to sleep when the outbox is empty.")
+
+    def handle(self, *args, **options):
+        while True:
+            close_old_connections()
+            sent, failed = process_due_messages(options['batch_size'])
+            if sent or failed:
+                self.stdout.write(f"sent: {sent}, failed: {failed}")
+                if options['verbosity'] >= 2:
+                    for provider, latency in latency_snapshots().items():
+                        self.stdout.write(f"{provider}: {latency}")
+            if options['once']:
+                return
+            if not sent and not failed:
+                time.sleep(options['poll_interval'])
@@ -1,7 +1,19 @@
 from django.db import models
+from django.db.models import F
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import RegexValidator
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
+from django.core.cache import cache
+from .user_cache import invalidate_user_payload
+
+# User fields copied into every JWT (core.authentication.add_user_claims)
+TOKEN_CLAIM_FIELDS = ('phone_number', 'selected_professional', 'is_verified')
+
+
+def token_version_cache_key(user_id):
+    return f'core:token_version:{user_id}'
+
 
 class CustomUser(AbstractUser):
 
@@ -46,6 +58,10 @@ class CustomUser(AbstractUser):
         null=True,
         help_text=_("Temporary code for SMS-based phone verification."),
     )
+    token_version = models.PositiveIntegerField(
+        default=0,
+        help_text=_("Incremented to revoke every JWT issued to the user."),
+    )
     created_at = models.DateTimeField(
         auto_now_add=True,
         help_text=_("Timestamp when the user was created."),
@@ -86,16 +102,105 @@ class CustomUser(AbstractUser):
     #     if self.email:
     #         self.email = self.email.lower().strip()
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Claim values as loaded, so save() can tell when issued tokens go stale
+        instance._loaded_claims = {
+            field: value for field, value in zip(field_names, values) if field in TOKEN_CLAIM_FIELDS
+        }
+        return instance
+
+    def changed_claims(self, update_fields=None):
+        loaded = getattr(self, '_loaded_claims', {})
+        fields = loaded.keys() if update_fields is None else loaded.keys() & set(update_fields)
+        return [field for field in fields if getattr(self, field) != loaded[field]]
+
     def save(self, *args, **kwargs):
         """
         Override save to normalize fields and ensure consistency.
+        Changing a field that is copied into JWTs revokes the tokens issued so far.
         """
         self.clean()
+        update_fields = kwargs.get('update_fields')
+        claims_changed = bool(self.changed_claims(update_fields))
+        if update_fields is None and not self._state.adding and not args and not kwargs.get('force_insert'):
+            # token_version only moves through F() updates; writing back the loaded
+            # value could undo a revoke_user_tokens() that ran after this row was read
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.attname not in deferred and field.name != 'token_version'
+            ]
         super().save(*args, **kwargs)
+        self._loaded_claims = {field: getattr(self, field) for field in TOKEN_CLAIM_FIELDS}
+        if claims_changed:
+            type(self).objects.filter(pk=self.pk).update(token_version=F('token_version') + 1)
+            self.refresh_from_db(fields=['token_version'])
+            cache.delete(token_version_cache_key(self.pk))
+        invalidate_user_payload(self.pk)
+
+    def delete(self, *args, **kwargs):
+        user_id = self.pk
+        result = super().delete(*args, **kwargs)
+        invalidate_user_payload(user_id)
+        return result
 
     # @property
     # def full_name(self):
     #     """
     #     Return the user's full name based on first_name and last_name.
     #     """
-    #     return f"{self.first_name} {self.last_name}".strip() or self.phone_number
\ No newline at end of file
+    #     return f"{self.first_name} {self.last_name}".strip() or self.phone_number
+
+class SmsMessage(models.Model):
+    """Outbox row: SMS waiting to be delivered by the `send_sms` worker."""
+    STATUS_PENDING = 'pending'
+    STATUS_SENT = 'sent'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, _("Pending")),
+        (STATUS_SENT, _("Sent")),
+        (STATUS_FAILED, _("Failed")),
+    ]
+
+    phone_number = models.CharField(max_length=15)
+    text = models.CharField(max_length=500)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    expires_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        help_text=_("Messages still pending after this time are dropped (e.g. expired OTP codes)."),
+    )
+    provider = models.CharField(max_length=20, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        db_table = "sms_outbox"
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+
+    def __str__(self):
+        return f"SMS to {self.phone_number} ({self.status})"
+
+
+class StoredFile(models.Model):
+    """Reference count of a content-addressed media file (see utils.storage)."""
+    name = models.CharField(max_length=255, unique=True)
+    size = models.PositiveBigIntegerField()
+    ref_count = models.PositiveIntegerField(
+        default=0,
+        help_text=_("Number of saves still pointing at this file; it is deleted when this reaches zero."),
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "stored_file"
+
+    def __str__(self):
+        return f"{self.name} ({self.ref_count} refs)"
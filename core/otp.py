@@ -0,0 +1,86 @@
+import hmac
+import math
+import secrets
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+OTP_CACHE_PREFIX = 'core:otp:'
+
+
+class OtpRateLimited(Exception):
+    def __init__(self, retry_after):
+        super().__init__(f"Too many verification code requests, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+def _hit(key, limit, window):
+    """
+    Fixed-window counter. Returns 0 while fewer than `limit` hits were made in the
+    window, otherwise the seconds left until the window resets.
+    """
+    now = time.time()
+    if cache.add(key, 0, window):
+        cache.set(f'{key}:reset', now + window, window)
+    try:
+        count = cache.incr(key)
+    except ValueError:  # expired between add() and incr()
+        cache.set(key, 1, window)
+        cache.set(f'{key}:reset', now + window, window)
+        count = 1
+    if count <= limit:
+        return 0
+    reset_at = cache.get(f'{key}:reset') or now + window
+    return max(math.ceil(reset_at - now), 1)
+
+
+def check_rate_limits(phone_number, ip_address):
+    limits = [
+        (f'{OTP_CACHE_PREFIX}phone-burst:{phone_number}', 1, settings.OTP_RESEND_INTERVAL_SECONDS),
+        (f'{OTP_CACHE_PREFIX}phone:{phone_number}', settings.OTP_PHONE_LIMIT_PER_HOUR, 3600),
+    ]
+    if ip_address:
+        limits.append((f'{OTP_CACHE_PREFIX}ip:{ip_address}', settings.OTP_IP_LIMIT_PER_HOUR, 3600))
+    for key, limit, window in limits:
+        retry_after = _hit(key, limit, window)
+        if retry_after:
+            raise OtpRateLimited(retry_after)
+
+
+def issue_code(phone_number, ip_address=None):
+    """Create a new code for the phone number, replacing any previous one."""
+    check_rate_limits(phone_number, ip_address)
+    code = f'{secrets.randbelow(900000) + 100000}'
+    # The nonce gives every code its own attempt counter
+    entry = {'code': code, 'nonce': secrets.token_hex(8), 'expires_at': time.time() + settings.OTP_TTL_SECONDS}
+    cache.set(f'{OTP_CACHE_PREFIX}code:{phone_number}', entry, settings.OTP_TTL_SECONDS)
+    return code
+
+
+def verify_code(phone_number, code):
+    """
+    Constant-time check of a submitted code. The code is consumed on success and
+    discarded after OTP_MAX_VERIFY_ATTEMPTS guesses.
+    """
+    key = f'{OTP_CACHE_PREFIX}code:{phone_number}'
+    entry = cache.get(key)
+    if entry is None:
+        return False
+    # Count the attempt atomically before comparing, so parallel guesses cannot
+    # get past the limit; the counter expires with the code
+    attempts_key = f"{OTP_CACHE_PREFIX}attempts:{phone_number}:{entry.get('nonce', '')}"
+    cache.add(attempts_key, 0, max(math.ceil(entry['expires_at'] - time.time()), 1))
+    try:
+        attempts = cache.incr(attempts_key)
+    except ValueError:  # expired together with the code
+        return False
+    if attempts > settings.OTP_MAX_VERIFY_ATTEMPTS:
+        cache.delete(key)
+        return False
+    if hmac.compare_digest(entry['code'], str(code)):
+        cache.delete_many([key, attempts_key])
+        return True
+    if attempts == settings.OTP_MAX_VERIFY_ATTEMPTS:
+        cache.delete(key)
+    return False
@@ -2,13 +2,18 @@ from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from utils.sms import send_verification_sms
-import random
+from .authentication import add_user_claims
+from .otp import verify_code
 import re
 
 User = get_user_model()
 
 # Login serializer for JWT using phone number
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
+    @classmethod
+    def get_token(cls, user):
+        return add_user_claims(super().get_token(user), user)
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.fields['phone_number'] = serializers.CharField()
@@ -95,19 +100,16 @@ class VerificationSerializer(serializers.Serializer):
     code = serializers.CharField(max_length=6)
 
     def validate(self, attrs):
-        try:
-            user = User.objects.get(phone_number=attrs['phone_number'])
-        except User.DoesNotExist:
-            raise serializers.ValidationError("کاربر یافت نشد.")
-        if user.verification_code != attrs['code']:
+        if not verify_code(attrs['phone_number'], attrs['code']):
             raise serializers.ValidationError("کد تأیید اشتباه است.")
         return attrs
 
     def save(self):
-        user = User.objects.get(phone_number=self.validated_data['phone_number'])
-        if user.verification_code == self.validated_data['code']:
+        # Only a successful verification touches the user row
+        user, created = User.objects.get_or_create(phone_number=self.validated_data['phone_number'])
+        if user.verification_code is not None:
             user.verification_code = None
-            user.save()
+            user.save(update_fields=['verification_code', 'updated_at'])
         return user
 
 # User details serializer
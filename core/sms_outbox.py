@@ -0,0 +1,76 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from utils.sms import SmsError, send_with_failover
+from .models import SmsMessage
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_sms(phone_number, text, ttl=None):
+    expires_at = timezone.now() + timedelta(seconds=ttl) if ttl else None
+    return SmsMessage.objects.create(phone_number=phone_number, text=text, expires_at=expires_at)
+
+
+def retry_delay(attempts):
+    """Exponential backoff: base, 2*base, 4*base ... capped at SMS_RETRY_MAX_SECONDS."""
+    return min(settings.SMS_RETRY_BASE_SECONDS * 2 ** (attempts - 1), settings.SMS_RETRY_MAX_SECONDS)
+
+
+def claim_due_messages(batch_size):
+    """Lock a batch of due messages so concurrent workers never send the same SMS twice."""
+    now = timezone.now()
+    with transaction.atomic():
+        messages = list(
+            SmsMessage.objects
+            .select_for_update(skip_locked=True)
+            .filter(status=SmsMessage.STATUS_PENDING, next_attempt_at__lte=now)
+            .order_by('next_attempt_at')[:batch_size]
+        )
+        # Push the claimed rows into the future while they are being sent
+        SmsMessage.objects.filter(pk__in=[message.pk for message in messages]).update(
+            next_attempt_at=now + timedelta(seconds=settings.SMS_RETRY_MAX_SECONDS)
+        )
+    return messages
+
+
+def deliver(message):
+    now = timezone.now()
+    if message.expires_at and message.expires_at <= now:
+        message.status = SmsMessage.STATUS_FAILED
+        message.last_error = "expired before delivery"
+        message.save(update_fields=['status', 'last_error'])
+        return False
+
+    message.attempts += 1
+    try:
+        message.provider = send_with_failover(message.phone_number, message.text)
+    except SmsError as e:
+        message.last_error = str(e)
+        if message.attempts >= settings.SMS_MAX_ATTEMPTS:
+            message.status = SmsMessage.STATUS_FAILED
+            logger.error(f"SMS {message.pk} to {message.phone_number} failed permanently: {e}")
+        else:
+            message.next_attempt_at = now + timedelta(seconds=retry_delay(message.attempts))
+        message.save(update_fields=['attempts', 'status', 'last_error', 'next_attempt_at'])
+        return False
+
+    message.status = SmsMessage.STATUS_SENT
+    message.sent_at = timezone.now()
+    message.save(update_fields=['attempts', 'status', 'provider', 'sent_at'])
+    return True
+
+
+def process_due_messages(batch_size=50):
+    """Send one batch of due messages; returns (sent, failed) counts."""
+    sent = failed = 0
+    for message in claim_due_messages(batch_size):
+        if deliver(message):
+            sent += 1
+        else:
+            failed += 1
+    return sent, failed
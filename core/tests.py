@@ -1,3 +1,389 @@
-from django.test import TestCase
+import io
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from unittest import mock
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
-# Create your tests here.
+from django.conf import settings
+from django.core.management import call_command
+from django.core.cache import cache, caches
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, APITestCase
+from rest_framework_simplejwt.exceptions import InvalidToken
+
+from utils.http_client import latency_snapshots
+from utils.sms import (
+    FakeSmsProvider, KavenegarProvider, SmsError, SmsProvider, send_bulk_with_failover, send_with_failover,
+)
+from . import otp
+from .authentication import StatelessJWTAuthentication, revoke_user_tokens, tokens_for_user
+from .management.commands import collect_orphaned_media
+from .models import CustomUser, SmsMessage, StoredFile
+from .sms_outbox import deliver, enqueue_sms, process_due_messages
+
+
+class StatelessJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()  # token versions are cached per user id
+        self.user = CustomUser.objects.create(phone_number='09120000001', selected_professional='Worker')
+
+    def authenticate(self, token):
+        request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        return StatelessJWTAuthentication().authenticate(request)[0]
+
+    def test_user_id_keeps_field_type(self):
+        user = self.authenticate(tokens_for_user(self.user).access_token)
+        self.assertEqual(user.id, self.user.pk)
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertIsInstance(user.id, int)
+
+    def test_changing_a_claim_revokes_tokens(self):
+        token = tokens_for_user(self.user).access_token
+        self.authenticate(token)
+        self.user.is_verified = True
+        self.user.save()
+        with self.assertRaises(InvalidToken):
+            self.authenticate(token)
+        user = self.authenticate(tokens_for_user(self.user).access_token)
+        self.assertTrue(user.is_verified)
+
+    def test_other_fields_keep_tokens_valid(self):
+        token = tokens_for_user(self.user).access_token
+        user = CustomUser.objects.get(pk=self.user.pk)
+        user.username = 'renamed'
+        user.save()
+        user.save(update_fields=['last_login'])
+        self.assertEqual(self.authenticate(token).id, self.user.pk)
+
+    def test_loaded_user_claim_change_revokes_tokens(self):
+        token = tokens_for_user(self.user).access_token
+        user = CustomUser.objects.get(pk=self.user.pk)
+        user.selected_professional = 'Contractor'
+        user.save(update_fields=['selected_professional'])
+        with self.assertRaises(InvalidToken):
+            self.authenticate(token)
+
+    def test_saving_a_stale_instance_keeps_tokens_revoked(self):
+        token = tokens_for_user(self.user).access_token
+        stale = CustomUser.objects.get(pk=self.user.pk)
+        revoke_user_tokens(self.user.pk)
+        stale.username = 'renamed'
+        stale.save()
+        stale.is_verified = True
+        stale.save()
+        self.assertEqual(CustomUser.objects.get(pk=self.user.pk).token_version, 2)
+        self.assertEqual(stale.token_version, 2)
+        with self.assertRaises(InvalidToken):
+            self.authenticate(token)
+
+
+class RegistrationTokenTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create(phone_number='09120000001')
+
+    def test_registration_reissues_tokens(self):
+        old_token = tokens_for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {old_token}')
+        response = self.client.post('/auth/register/', {
+            'phone_number': '09120000001', 'selected_professional': 'Worker', 'national_code': '0012345678',
+        })
+        self.assertEqual(response.status_code, 201)
+
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {old_token}')
+        self.assertEqual(self.client.get('/my-profile/skills/').status_code, 401)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        self.assertEqual(self.client.get('/my-profile/skills/').status_code, 200)
+
+    def test_cannot_register_someone_elses_number(self):
+        victim = CustomUser.objects.create(phone_number='09120000002', selected_professional='Worker')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {tokens_for_user(self.user).access_token}')
+        response = self.client.post('/auth/register/', {
+            'phone_number': victim.phone_number, 'selected_professional': 'Employer', 'national_code': '0012345678',
+        })
+        self.assertEqual(response.status_code, 403)
+        self.assertNotIn('access', response.data)
+        self.assertNotIn('refresh', response.data)
+        victim.refresh_from_db()
+        self.assertEqual((victim.selected_professional, victim.national_code), ('Worker', None))
+
+
+class FailingSmsProvider(SmsProvider):
+    name = 'failing'
+
+    def send(self, phone_number, text):
+        raise SmsError("provider down")
+
+
+@override_settings(SMS_PROVIDERS=['utils.sms.FakeSmsProvider'])
+class SmsOutboxTests(APITestCase):
+    """The whole OTP flow runs offline against FakeSmsProvider."""
+
+    def setUp(self):
+        cache.clear()
+        FakeSmsProvider.sent.clear()
+
+    def test_verification_code_is_queued_and_delivered(self):
+        response = self.client.post('/api/request-verification/', {'phone_number': '09120000001'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(FakeSmsProvider.sent, [])  # the request only queues the SMS
+
+        self.assertEqual(process_due_messages(), (1, 0))
+        phone_number, text = FakeSmsProvider.sent[0]
+        self.assertEqual(phone_number, '09120000001')
+        code = re.search(r'\d{4,6}', text).group()
+
+        response = self.client.post('/api/verify/', {'phone_number': '09120000001', 'code': code}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('access', response.data)
+
+    @override_settings(SMS_PROVIDERS=[f'{__name__}.FailingSmsProvider', 'utils.sms.FakeSmsProvider'])
+    def test_fails_over_to_next_provider(self):
+        message = enqueue_sms('09120000001', 'hello')
+        self.assertEqual(process_due_messages(), (1, 0))
+        message.refresh_from_db()
+        self.assertEqual((message.status, message.provider), (SmsMessage.STATUS_SENT, 'fake'))
+
+    @override_settings(SMS_PROVIDERS=[f'{__name__}.FailingSmsProvider'], SMS_MAX_ATTEMPTS=2)
+    def test_retries_with_backoff_then_gives_up(self):
+        message = enqueue_sms('09120000001', 'hello')
+        self.assertEqual(process_due_messages(), (0, 1))
+        message.refresh_from_db()
+        self.assertEqual(message.status, SmsMessage.STATUS_PENDING)
+        self.assertGreater(message.next_attempt_at, timezone.now())
+        self.assertEqual(process_due_messages(), (0, 0))  # not due yet
+
+        SmsMessage.objects.filter(pk=message.pk).update(next_attempt_at=timezone.now())
+        self.assertEqual(process_due_messages(), (0, 1))
+        message.refresh_from_db()
+        self.assertEqual((message.status, message.attempts), (SmsMessage.STATUS_FAILED, 2))
+
+    def test_expired_message_is_dropped(self):
+        message = enqueue_sms('09120000001', 'code', ttl=60)
+        message.expires_at = timezone.now() - timedelta(seconds=1)
+        self.assertFalse(deliver(message))
+        self.assertEqual(message.status, SmsMessage.STATUS_FAILED)
+        self.assertEqual(FakeSmsProvider.sent, [])
+
+
+class StubProviderHandler(BaseHTTPRequestHandler):
+    """Kavenegar-shaped stub: keeps connections alive and records who called."""
+    protocol_version = 'HTTP/1.1'
+    requests = []
+    fail_requests = set()  # 1-based request numbers answered with a 500
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length'])).decode()
+        self.requests.append((self.client_address, body))
+        failed = len(self.requests) in self.fail_requests
+        payload = json.dumps({'return': {'status': 500 if failed else 200, 'message': 'down' if failed else 'ok'}})
+        self.send_response(500 if failed else 200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload.encode())
+
+    def log_message(self, format, *args):
+        pass
+
+
+class SmallBatchKavenegarProvider(KavenegarProvider):
+    bulk_size = 2
+
+
+class ProviderHttpClientTests(TestCase):
+    """Provider calls against a local stub server instead of the real SMS APIs."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), StubProviderHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f'http://127.0.0.1:{cls.server.server_address[1]}/'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        StubProviderHandler.requests = []
+        StubProviderHandler.fail_requests = set()
+        FakeSmsProvider.sent.clear()
+
+    def test_sends_reuse_one_keep_alive_connection(self):
+        with self.settings(KAVENEGAR_BASE_URL=self.base_url, SMS_PROVIDERS=['utils.sms.KavenegarProvider']):
+            before = latency_snapshots().get('kavenegar', {}).get('count', 0)
+            for index in range(5):
+                self.assertEqual(send_with_failover(f'0912000000{index}', 'hello'), 'kavenegar')
+        self.assertEqual(len(StubProviderHandler.requests), 5)
+        self.assertEqual(len({address for address, _ in StubProviderHandler.requests}), 1)
+        self.assertEqual(latency_snapshots()['kavenegar']['count'] - before, 5)
+
+    def test_bulk_failover_resends_only_the_remainder(self):
+        StubProviderHandler.fail_requests = {2}
+        providers = [f'{__name__}.SmallBatchKavenegarProvider', 'utils.sms.FakeSmsProvider']
+        numbers = [f'0912000000{index}' for index in range(5)]
+        with self.settings(KAVENEGAR_BASE_URL=self.base_url, SMS_PROVIDERS=providers):
+            self.assertEqual(send_bulk_with_failover(numbers, 'hello'), 'fake')
+        self.assertEqual(len(StubProviderHandler.requests), 2)
+        self.assertEqual([number for number, _ in FakeSmsProvider.sent], numbers[2:])
+
+    def test_provider_error_is_reported(self):
+        StubProviderHandler.fail_requests = {1}
+        with self.settings(KAVENEGAR_BASE_URL=self.base_url, SMS_PROVIDERS=['utils.sms.KavenegarProvider']):
+            with self.assertRaisesMessage(SmsError, 'down'):
+                send_with_failover('09120000001', 'hello')
+
+
+class OtpTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+
+    def request_code(self, phone_number, **headers):
+        return self.client.post('/api/request-verification/', {'phone_number': phone_number}, format='json', **headers)
+
+    def test_parallel_wrong_guesses_stop_at_the_limit(self):
+        code = otp.issue_code('09120000001')
+        comparisons = []
+        compare_digest = otp.hmac.compare_digest
+
+        def counting_compare(a, b):
+            comparisons.append(b)
+            return compare_digest(a, b)
+
+        # Cache objects are per thread, so patch the backend class
+        cache_class = type(caches['default'])
+        cache_get = cache_class.get
+
+        def slow_get(self, *args, **kwargs):
+            # Widen the window between reading the code entry and acting on it
+            value = cache_get(self, *args, **kwargs)
+            time.sleep(0.01)
+            return value
+
+        barrier = threading.Barrier(20)
+
+        def guess():
+            barrier.wait()
+            otp.verify_code('09120000001', '000000')
+
+        with mock.patch.object(otp.hmac, 'compare_digest', counting_compare), \
+                mock.patch.object(cache_class, 'get', slow_get):
+            threads = [threading.Thread(target=guess) for _ in range(20)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertLessEqual(len(comparisons), settings.OTP_MAX_VERIFY_ATTEMPTS)
+        self.assertFalse(otp.verify_code('09120000001', code))
+
+    def test_code_is_rejected_after_max_attempts(self):
+        code = otp.issue_code('09120000001')
+        for _ in range(settings.OTP_MAX_VERIFY_ATTEMPTS):
+            self.assertFalse(otp.verify_code('09120000001', '000000'))
+        self.assertFalse(otp.verify_code('09120000001', code))
+
+    def test_retry_after_is_the_time_left_in_the_window(self):
+        now = 1_000_000.0
+        with mock.patch.object(otp.time, 'time', return_value=now):
+            self.assertEqual(self.request_code('09120000001').status_code, 200)
+        with mock.patch.object(otp.time, 'time', return_value=now + 45):
+            response = self.request_code('09120000001')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], str(settings.OTP_RESEND_INTERVAL_SECONDS - 45))
+
+    @override_settings(CLIENT_IP_HEADER='X-Forwarded-For', TRUSTED_PROXY_COUNT=1, OTP_IP_LIMIT_PER_HOUR=1)
+    def test_ip_limit_uses_the_forwarded_client_address(self):
+        # Every request arrives from the front server's address
+        self.assertEqual(self.request_code('09120000001', HTTP_X_FORWARDED_FOR='1.1.1.1').status_code, 200)
+        self.assertEqual(self.request_code('09120000002', HTTP_X_FORWARDED_FOR='9.9.9.9, 2.2.2.2').status_code, 200)
+        self.assertEqual(self.request_code('09120000003', HTTP_X_FORWARDED_FOR='1.1.1.1').status_code, 429)
+
+
+class BatchUserListTests(APITestCase):
+    """?ids= on the user list is scoped like the plain list."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create(phone_number='09120000001', selected_professional='Worker')
+        self.other = CustomUser.objects.create(phone_number='09120000002', selected_professional='Worker')
+        self.url = f'/auth/users/?ids={self.user.pk},{self.other.pk}'
+
+    def authenticate(self, user):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {tokens_for_user(user).access_token}')
+
+    def test_non_staff_only_gets_themselves(self):
+        self.authenticate(self.user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([user['id'] for user in response.json()], [self.user.pk])
+
+    def test_staff_gets_every_user(self):
+        self.user.is_staff = True
+        self.user.save()
+        self.authenticate(self.user)
+        response = self.client.get(self.url)
+        self.assertEqual([user['id'] for user in response.json()], [self.user.pk, self.other.pk])
+
+
+class LegacyMediaRouteTests(TestCase):
+    """Uploads stay reachable under the old /register-ad/images/ and /my-profile/images/ mounts."""
+
+    def setUp(self):
+        self.media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.media_root.cleanup)
+        os.makedirs(os.path.join(self.media_root.name, 'profile'))
+        with open(os.path.join(self.media_root.name, 'profile', 'a.jpg'), 'wb') as f:
+            f.write(b'jpeg bytes')
+
+    def test_old_mounts_serve_the_same_file(self):
+        with self.settings(MEDIA_ROOT=self.media_root.name, MEDIA_SERVING='django'):
+            for url in ('/images/profile/a.jpg', '/register-ad/images/profile/a.jpg', '/my-profile/images/profile/a.jpg'):
+                with self.subTest(url=url):
+                    response = self.client.get(url)
+                    self.assertEqual(response.status_code, 200)
+                    self.assertEqual(b''.join(response.streaming_content), b'jpeg bytes')
+
+
+class CollectOrphanedMediaTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        self.root = media_root.name
+        for name in ('a.jpg', 'c.jpg', 'files/aa/bb/aabb.jpg'):
+            path = os.path.join(self.root, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(b'x')
+            os.utime(path, (time.time() - 7200,) * 2)
+
+    def collect(self):
+        with self.settings(MEDIA_ROOT=self.root):
+            call_command('collect_orphaned_media', delete=True, stdout=io.StringIO())
+
+    def remaining(self):
+        return sorted(
+            os.path.relpath(os.path.join(directory, name), self.root)
+            for directory, _, names in os.walk(self.root) for name in names
+        )
+
+    def test_keeps_files_with_live_references(self):
+        StoredFile.objects.create(name='files/aa/bb/aabb.jpg', size=1, ref_count=1)
+        StoredFile.objects.create(name='a.jpg', size=1, ref_count=0)
+        self.collect()
+        self.assertEqual(self.remaining(), ['files/aa/bb/aabb.jpg'])
+        self.assertEqual(list(StoredFile.objects.values_list('name', flat=True)), ['files/aa/bb/aabb.jpg'])
+
+    def test_rechecks_references_under_the_lock(self):
+        # c.jpg gets attached to a row between the scan and the delete
+        with mock.patch.object(collect_orphaned_media, 'referenced', side_effect=[set(), {'c.jpg'}]):
+            self.collect()
+        self.assertEqual(self.remaining(), ['c.jpg'])
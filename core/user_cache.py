@@ -0,0 +1,60 @@
+from django.conf import settings
+from django.core.cache import cache
+
+USER_CACHE_PREFIX = 'core:user:'
+
+
+def user_cache_key(user_id):
+    return f'{USER_CACHE_PREFIX}{user_id}'
+
+
+def _serialize(user):
+    from .serializers import UserSerializer
+    return UserSerializer(user).data
+
+
+def _timeout():
+    return getattr(settings, 'USER_CACHE_TIMEOUT', 300)
+
+
+def get_user_payload(user_id):
+    """Read-through lookup of a UserSerializer payload; None if the user does not exist."""
+    from .models import CustomUser
+
+    key = user_cache_key(user_id)
+    data = cache.get(key)
+    if data is None:
+        user = CustomUser.objects.filter(pk=user_id).first()
+        if user is None:
+            return None
+        data = dict(_serialize(user))
+        cache.set(key, data, _timeout())
+    return data
+
+
+def get_user_payloads(user_ids):
+    """Batch variant of get_user_payload: one cache round trip and at most one query."""
+    from .models import CustomUser
+
+    cached = cache.get_many([user_cache_key(user_id) for user_id in user_ids])
+    payloads = {}
+    missing = []
+    for user_id in user_ids:
+        data = cached.get(user_cache_key(user_id))
+        if data is None:
+            missing.append(user_id)
+        else:
+            payloads[user_id] = data
+
+    if missing:
+        fresh = {}
+        for user in CustomUser.objects.filter(pk__in=missing):
+            data = dict(_serialize(user))
+            payloads[user.pk] = data
+            fresh[user_cache_key(user.pk)] = data
+        cache.set_many(fresh, _timeout())
+    return payloads
+
+
+def invalidate_user_payload(user_id):
+    cache.delete(user_cache_key(user_id))
@@ -1,16 +1,22 @@
 import json
-import random
 import re
 
+from django.conf import settings
 from django.http import JsonResponse
+from djoser.views import UserViewSet
 from django.views.decorators.csrf import csrf_exempt
-from melipayamak import Api
 from rest_framework import generics, status
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.response import Response
 from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework.permissions import AllowAny, IsAuthenticated
+from utils.client_ip import client_ip
 from .models import CustomUser
 from .serializers import CustomUserCreateSerializer, VerificationSerializer, CustomTokenObtainPairSerializer, UserSerializer
+from .user_cache import get_user_payload, get_user_payloads
+from .authentication import revoke_user_tokens, tokens_for_user
+from .sms_outbox import enqueue_sms
+from . import otp
 import logging
 
 logger = logging.getLogger(__name__)
@@ -20,6 +26,14 @@ logger = logging.getLogger(__name__)
 class CustomTokenObtainPairView(TokenObtainPairView):
     serializer_class = CustomTokenObtainPairSerializer
 
+# Revokes every access/refresh token of the current user (logout from all devices)
+class RevokeTokensView(generics.GenericAPIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        revoke_user_tokens(request.user.id)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
 # Registration view
 class UserCreateView(generics.CreateAPIView):
     queryset = CustomUser.objects.all()
@@ -28,12 +42,20 @@ class UserCreateView(generics.CreateAPIView):
     def post(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
+        # The serializer updates whichever account owns the number, so it has to be the caller's own
+        if serializer.validated_data['phone_number'] != request.user.phone_number:
+            return Response({"error": "فقط می‌توانید حساب خودتان را ثبت کنید."}, status=status.HTTP_403_FORBIDDEN)
         user = serializer.save()
-        return Response({
+        data = {
             "message": "لطفاً کد تأیید ارسال‌شده به شماره تلفن خود را وارد کنید.",
             "phone_number": user.phone_number,
-            "national_code": user.national_code
-        }, status=status.HTTP_201_CREATED)
+            "national_code": user.national_code,
+        }
+        if user.pk == request.user.pk:
+            # Saving selected_professional/is_verified revoked the tokens carrying the old claims
+            refresh = tokens_for_user(user)
+            data.update(access=str(refresh.access_token), refresh=str(refresh))
+        return Response(data, status=status.HTTP_201_CREATED)
 
 
 
@@ -58,14 +80,18 @@ def request_verification_code(request):
             # Use phone_number as-is for SMS recipient
             recipient = phone_number
 
-            # Create or get user (store raw user input)
-            user, created = CustomUser.objects.get_or_create(phone_number=phone_number)
-            verification_code = str(random.randint(100000, 999999))
-            user.verification_code = verification_code
-            user.save()
+            # The code lives in the cache; the user row is only written once the code is verified
+            try:
+                verification_code = otp.issue_code(phone_number, client_ip(request))
+            except otp.OtpRateLimited as e:
+                logger.warning(f"Verification code rate limit hit for {phone_number}")
+                response = JsonResponse({'error': 'تعداد درخواست‌ها بیش از حد مجاز است. لطفاً بعداً تلاش کنید.'}, status=429)
+                response['Retry-After'] = str(e.retry_after)
+                return response
 
             # If already verified
-            if not created and user.is_verified:
+            is_verified = CustomUser.objects.filter(phone_number=phone_number).values_list('is_verified', flat=True).first()
+            if is_verified:
                 logger.info(f"User {phone_number} is already verified")
                 return JsonResponse({
                     'message': 'کاربر قبلاً تأیید شده است. لطفاً کد تأیید را وارد کنید.',
@@ -73,24 +99,10 @@ def request_verification_code(request):
                     'phone_number': phone_number
                 })
 
-            # Send verification code via Meli Payamak
-            try:
-                api = Api(username, password)
-                sms = api.sms()
-                text = f'کد تأیید شما: {verification_code}'
-                response = sms.send(recipient, _from, text)
-                logger.info(f"Meli Payamak response for {recipient}: {response}")
-
-                if isinstance(response, dict) and response.get('RetStatus') != 1:
-                    logger.error(f"Meli Payamak failed to send SMS: {response}")
-                    return JsonResponse({
-                        'error': f'خطا در ارسال پیامک: {response.get("StrRetStatus", "Unknown error")}'
-                    }, status=500)
-            except Exception as e:
-                logger.error(f"Meli Payamak error: {str(e)}")
-                return JsonResponse({'error': f'خطا در ارسال پیامک: {str(e)}'}, status=500)
-
-            logger.info(f"Verification code {verification_code} sent to {recipient}.")
+            # Delivered by the send_sms worker; the request does not wait for the provider
+            enqueue_sms(recipient, f'کد تأیید شما: {verification_code}', ttl=settings.OTP_TTL_SECONDS)
+
+            logger.info(f"Verification code queued for {recipient}.")
             return JsonResponse({
                 'message': 'کد تأیید با موفقیت ارسال شد.',
                 'is_verified': False,
@@ -120,8 +132,7 @@ class VerifyCodeView(generics.GenericAPIView):
 
         # Check if the code is valid
         if user.verification_code is None:
-            from rest_framework_simplejwt.tokens import RefreshToken
-            refresh = RefreshToken.for_user(user)
+            refresh = tokens_for_user(user)
             response_data = {
                 "message": "کد تأیید با موفقیت تأیید شد.",
                 "user": UserSerializer(user).data,
@@ -144,4 +155,40 @@ class UserDetailView(generics.RetrieveAPIView):
     queryset = CustomUser.objects.all()
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]
-    lookup_field = 'pk'
\ No newline at end of file
+    lookup_field = 'pk'
+
+
+# djoser's /auth/users/ with cached reads for /auth/users/<id>/ and /auth/users/?ids=1,2,3
+class CachedUserViewSet(UserViewSet):
+    max_batch_ids = 100
+
+    def retrieve(self, request, *args, **kwargs):
+        if self.action != 'retrieve':  # /auth/users/me/ also goes through retrieve
+            return super().retrieve(request, *args, **kwargs)
+        try:
+            user_id = int(kwargs[self.lookup_url_kwarg or self.lookup_field])
+        except ValueError:
+            raise NotFound()
+        data = get_user_payload(user_id)
+        if data is None:
+            raise NotFound()
+        return Response(data)
+
+    def list(self, request, *args, **kwargs):
+        ids = request.query_params.get('ids')
+        if ids is None:
+            return super().list(request, *args, **kwargs)
+        try:
+            user_ids = list(dict.fromkeys(int(user_id) for user_id in ids.split(',') if user_id.strip()))
+        except ValueError:
+            raise ValidationError({"ids": "شناسه‌ها باید عدد و با کاما جدا شده باشند."})
+        if len(user_ids) > self.max_batch_ids:
+            raise ValidationError({"ids": f"حداکثر {self.max_batch_ids} شناسه مجاز است."})
+        # Same scoping as the plain list: with HIDE_USERS non-staff users only see themselves
+        visible_ids = set()
+        for user in self.get_queryset().filter(pk__in=user_ids).only('pk'):
+            self.check_object_permissions(request, user)
+            visible_ids.add(user.pk)
+        user_ids = [user_id for user_id in user_ids if user_id in visible_ids]
+        payloads = get_user_payloads(user_ids)
+        return Response([{'id': user_id, **payloads[user_id]} for user_id in user_ids if user_id in payloads])
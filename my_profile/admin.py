@@ -1,6 +1,7 @@
 from django.contrib import admin
 
-from .models import Profile, Sample_image
+from .models import ImageJob, Profile, Sample_image
 
 admin.site.register(Profile)
 admin.site.register(Sample_image)
+admin.site.register(ImageJob)
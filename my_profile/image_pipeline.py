@@ -0,0 +1,134 @@
+import logging
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+
+from utils.images import submit_compress
+from .models import IMAGE_FAILED, IMAGE_PENDING, IMAGE_READY, ImageJob, Profile, Sample_image
+
+logger = logging.getLogger(__name__)
+
+def store_original(upload, folder):
+    """Write the uploaded file as-is; the worker replaces it with compressed renditions."""
+    # The storage names the file by its content hash and keeps only the extension
+    return default_storage.save(os.path.join(folder, os.path.basename(upload.name)), upload)
+
+
+def enqueue_image_jobs(profile, picture=False, samples=()):
+    """Queue processing for the profile picture and/or new sample rows; call inside the metadata transaction."""
+    jobs = [ImageJob(profile=profile, sample=sample) for sample in samples]
+    if picture:
+        jobs.append(ImageJob(profile=profile))
+    ImageJob.objects.bulk_create(jobs)
+
+
+def job_target(job):
+    """(model, pk, image field, webp field, status field) the job writes to."""
+    if job.sample_id:
+        return Sample_image, job.sample_id, 'image', 'image_webp', 'status'
+    return Profile, job.profile_id, 'profile_picture', 'profile_picture_webp', 'picture_status'
+
+
+def claim_due_jobs(batch_size):
+    """Lock a batch of due jobs so concurrent workers never process the same upload twice."""
+    now = timezone.now()
+    with transaction.atomic():
+        jobs = list(
+            ImageJob.objects
+            .select_for_update(skip_locked=True)
+            .filter(status=ImageJob.STATUS_PENDING, next_attempt_at__lte=now)
+            .order_by('next_attempt_at')[:batch_size]
+        )
+        # Push the claimed rows into the future while they are being processed
+        ImageJob.objects.filter(pk__in=[job.pk for job in jobs]).update(
+            next_attempt_at=now + timedelta(seconds=settings.IMAGE_JOB_RETRY_SECONDS)
+        )
+    return jobs
+
+
+def read_source(job):
+    """(source name, bytes) of the upload the job should process, or (None, None) if there is nothing left to do."""
+    model, pk, field, webp_field, status_field = job_target(job)
+    row = model.objects.filter(pk=pk).values(field, status_field).first()
+    if row is None or row[status_field] != IMAGE_PENDING or not row[field]:
+        return None, None  # deleted, cleared or already processed by an earlier job
+
+    source = row[field]
+    with default_storage.open(source, 'rb') as f:
+        return source, f.read()
+
+
+def store_renditions(job, source, renditions):
+    model, pk, field, webp_field, status_field = job_target(job)
+    base = os.path.splitext(source)[0]
+    paths = {
+        extension: default_storage.save(f"{base}_compressed.{extension}", ContentFile(data))
+        for extension, data in renditions.items()
+    }
+
+    # Only swap in the renditions if the user has not replaced the picture meanwhile
+    updated = model.objects.filter(pk=pk, **{field: source}).update(
+        **{field: paths['jpg'], webp_field: paths['webp'], status_field: IMAGE_READY}
+    )
+    for path in ([source] if updated else paths.values()):
+        default_storage.delete(path)
+
+
+def finish(job):
+    job.attempts += 1
+    job.status = ImageJob.STATUS_DONE
+    job.finished_at = timezone.now()
+    job.save(update_fields=['attempts', 'status', 'finished_at'])
+
+
+def fail(job, error):
+    job.attempts += 1
+    job.last_error = str(error)
+    if job.attempts >= settings.IMAGE_JOB_MAX_ATTEMPTS:
+        job.status = ImageJob.STATUS_FAILED
+        job.finished_at = timezone.now()
+        # Keep serving the original upload
+        model, pk, field, webp_field, status_field = job_target(job)
+        model.objects.filter(pk=pk, **{status_field: IMAGE_PENDING}).update(**{status_field: IMAGE_FAILED})
+        logger.error(f"Image job {job.pk} failed permanently: {error}")
+    else:
+        job.next_attempt_at = timezone.now() + timedelta(seconds=settings.IMAGE_JOB_RETRY_SECONDS)
+        logger.warning(f"Image job {job.pk} failed, will retry: {error}")
+    job.save(update_fields=['attempts', 'status', 'last_error', 'next_attempt_at', 'finished_at'])
+
+
+def process_batch(jobs):
+    """
+    Read every source, compress them in parallel in the image process pool, then
+    store the results. Returns (done, failed) counts.
+    """
+    pending = []
+    done = failed = 0
+    for job in jobs:
+        try:
+            source, data = read_source(job)
+        except Exception as e:
+            fail(job, e)
+            failed += 1
+            continue
+        if source is None:
+            finish(job)
+            done += 1
+        else:
+            pending.append((job, source, submit_compress(data, max_dimension=settings.IMAGE_MAX_DIMENSION)))
+
+    for job, source, future in pending:
+        try:
+            store_renditions(job, source, future.result())
+        except Exception as e:
+            fail(job, e)
+            failed += 1
+        else:
+            finish(job)
+            done += 1
+    return done, failed
@@ -0,0 +1,67 @@
+import io
+import resource
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from PIL import Image
+
+from utils.images import _compress_bytes, get_process_pool, submit_compress
+
+
+def synthetic_photo(width, height, seed):
+    """A JPEG with photo-like detail (a noisy gradient), so encoders do realistic work."""
+    noise = Image.effect_noise((width, height), 40 + seed)
+    gradient = Image.linear_gradient('L').resize((width, height))
+    img = Image.merge('RGB', (noise, gradient, Image.blend(noise, gradient, 0.5)))
+    output = io.BytesIO()
+    img.save(output, format='JPEG', quality=90)
+    return output.getvalue()
+
+
+class Command(BaseCommand):
+    help = "Wall time per batch of uploaded photos: serial full decode vs draft decode vs the process pool."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--photos', type=int, default=5)
+        parser.add_argument('--width', type=int, default=4000)
+        parser.add_argument('--height', type=int, default=3000)
+        parser.add_argument('--rounds', type=int, default=3)
+
+    def handle(self, *args, **options):
+        megapixels = options['width'] * options['height'] / 1e6
+        self.stdout.write(f"Generating {options['photos']} {megapixels:.0f}MP JPEGs...")
+        batch = [synthetic_photo(options['width'], options['height'], i) for i in range(options['photos'])]
+        max_dimension = settings.IMAGE_MAX_DIMENSION
+        formats = ('jpg', 'webp')
+
+        def serial_full():
+            # What the upload views did before: full-size decode, no resize
+            for data in batch:
+                _compress_bytes(data, formats, None)
+
+        def serial_draft():
+            for data in batch:
+                _compress_bytes(data, formats, max_dimension)
+
+        def pooled_draft():
+            futures = [submit_compress(data, formats, max_dimension) for data in batch]
+            for future in futures:
+                future.result()
+
+        if get_process_pool() is not None:
+            pooled_draft()  # start the worker processes outside the measurement
+
+        self.stdout.write(f"{'mode':<14} {'ms/batch':>10}")
+        for label, run in (('serial full', serial_full), ('serial draft', serial_draft), ('pool draft', pooled_draft)):
+            start = time.perf_counter()
+            for _ in range(options['rounds']):
+                run()
+            elapsed_ms = (time.perf_counter() - start) / options['rounds'] * 1000
+            self.stdout.write(f"{label:<14} {elapsed_ms:>10.0f}")
+
+        self.stdout.write(
+            f"workers: {settings.IMAGE_PROCESS_WORKERS}, "
+            f"peak RSS this process: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // 1024} MB, "
+            f"largest worker: {resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss // 1024} MB"
+        )
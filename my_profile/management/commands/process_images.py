@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from my_profile.image_pipeline import claim_due_jobs, process_batch
+
+
+class Command(BaseCommand):
+    help = (
+        "Compress uploaded profile and sample pictures into JPEG/WebP renditions. "
+        "Decoding and encoding run in parallel in IMAGE_PROCESS_WORKERS processes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Process one batch and exit.")
+        parser.add_argument('--batch-size', type=int, default=20)
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help="Seconds to sleep when the queue is empty.")
+
+    def handle(self, *args, **options):
+        while True:
+            close_old_connections()
+            jobs = claim_due_jobs(options['batch_size'])
+            if jobs:
+                done, failed = process_batch(jobs)
+                self.stdout.write(f"processed: {done}, failed: {failed}")
+            if options['once']:
+                return
+            if not jobs:
+                time.sleep(options['poll_interval'])
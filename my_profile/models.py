@@ -6,6 +6,17 @@ from component.skill import SKILL
 
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
+
+# Processing state of an uploaded picture (see my_profile.image_pipeline)
+IMAGE_PENDING = 'pending'
+IMAGE_READY = 'ready'
+IMAGE_FAILED = 'failed'
+IMAGE_STATUS_CHOICES = [
+    (IMAGE_PENDING, 'Pending'),
+    (IMAGE_READY, 'Ready'),
+    (IMAGE_FAILED, 'Failed'),
+]
 
 class Profile(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='worker_profile')
@@ -16,6 +27,8 @@ class Profile(models.Model):
     skill = models.CharField(max_length=50, choices=SKILL, null=True, blank=True)
     description = models.TextField()
     profile_picture = models.ImageField(upload_to='profile/picture/', null=True, blank=True)
+    profile_picture_webp = models.ImageField(upload_to='profile/picture/', null=True, blank=True)
+    picture_status = models.CharField(max_length=10, choices=IMAGE_STATUS_CHOICES, default=IMAGE_READY)
 
     def __str__(self):
         return f"{self.name}'s Profile"
@@ -23,3 +36,37 @@ class Profile(models.Model):
 class Sample_image(models.Model):
     profile = models.ForeignKey(Profile, on_delete=models.CASCADE, related_name='samples')
     image = models.ImageField(upload_to='profile/sample/', null=True, blank=True)
+    image_webp = models.ImageField(upload_to='profile/sample/', null=True, blank=True)
+    status = models.CharField(max_length=10, choices=IMAGE_STATUS_CHOICES, default=IMAGE_READY)
+
+
+class ImageJob(models.Model):
+    """Queue row: an uploaded original waiting for the `process_images` worker."""
+    STATUS_PENDING = 'pending'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    profile = models.ForeignKey(Profile, on_delete=models.CASCADE, related_name='image_jobs')
+    # Empty for the profile picture itself
+    sample = models.ForeignKey(Sample_image, on_delete=models.CASCADE, null=True, blank=True, related_name='jobs')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        db_table = "image_job"
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+
+    def __str__(self):
+        target = f"sample {self.sample_id}" if self.sample_id else "profile picture"
+        return f"Image job for profile {self.profile_id} {target} ({self.status})"
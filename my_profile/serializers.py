@@ -13,7 +13,8 @@ class SkillSerializer(serializers.Serializer):
 class SampleImageSerializer(serializers.ModelSerializer):
     class Meta:
         model = Sample_image
-        fields = ['id', 'image']
+        fields = ['id', 'image', 'image_webp', 'status']
+        read_only_fields = ['image_webp', 'status']
 
     # def to_representation(self, instance):
     #     representation = super().to_representation(instance)
@@ -33,9 +34,10 @@ class ProfileSerializer(serializers.ModelSerializer):
         model = Profile
         fields = [
             'user', 'name', 'gender', 'city',
-            'description', 'skill', 'profile_picture', 'sample_images'
+            'description', 'skill', 'profile_picture', 'profile_picture_webp',
+            'picture_status', 'sample_images'
         ]
-        read_only_fields = ['user']
+        read_only_fields = ['user', 'profile_picture_webp', 'picture_status']
 
     def get_sample_images(self, obj):
         sample_images = obj.samples.all()
@@ -43,13 +45,15 @@ class ProfileSerializer(serializers.ModelSerializer):
 
     def to_representation(self, instance):
         representation = super().to_representation(instance)
-        if instance.profile_picture:
-            profile_picture_url = f"{settings.MEDIA_URL}{instance.profile_picture}"
-            if not profile_picture_url.startswith('http'):
-                profile_picture_url = f"{self.context['request'].scheme}://{self.context['request'].get_host()}{profile_picture_url}"
-            representation['profile_picture'] = profile_picture_url
-        else:
-            representation['profile_picture'] = ''
+        for field in ('profile_picture', 'profile_picture_webp'):
+            image = getattr(instance, field)
+            if image:
+                image_url = f"{settings.MEDIA_URL}{image}"
+                if not image_url.startswith('http'):
+                    image_url = f"{self.context['request'].scheme}://{self.context['request'].get_host()}{image_url}"
+                representation[field] = image_url
+            else:
+                representation[field] = ''
         logger.info(f"Serialized profile for user {instance.user_id}, gender: {representation['gender']}")
         return representation
 
@@ -1,3 +1,107 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from io import BytesIO
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from PIL import Image
+from rest_framework.test import APITestCase
+
+from core.authentication import tokens_for_user
+from core.models import CustomUser, StoredFile
+from .models import Profile, Sample_image
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ProfileOwnerTests(APITestCase):
+    """Owner checks compare profile.user_id with request.user.id from a claims-only JWT user."""
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()  # token versions are cached per user id
+        self.owner = CustomUser.objects.create(phone_number='09120000001', selected_professional='Worker', is_verified=True)
+        self.other = CustomUser.objects.create(phone_number='09120000002', selected_professional='Worker', is_verified=True)
+        self.profile = Profile.objects.create(user=self.owner, name='علی', city='تهران', gender='مرد', description='d')
+        Profile.objects.create(user=self.other, name='رضا', city='تهران', gender='مرد', description='d')
+
+    def authenticate(self, user):
+        token = tokens_for_user(user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_owner_can_read_profile(self):
+        self.authenticate(self.owner)
+        response = self.client.get(f'/my-profile/profile/{self.owner.pk}/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_owner_can_update_profile(self):
+        self.authenticate(self.owner)
+        response = self.client.patch(
+            f'/my-profile/profile/{self.owner.pk}/', {'name': 'حسن', 'gender': 'مرد'}, format='multipart'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.name, 'حسن')
+
+    def test_owner_can_delete_sample_image(self):
+        sample = Sample_image.objects.create(profile=self.profile, image=ContentFile(b'x', name='s.jpg'))
+        self.authenticate(self.owner)
+        response = self.client.delete(f'/my-profile/profile/{self.owner.pk}/images/{sample.pk}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Sample_image.objects.filter(pk=sample.pk).exists())
+
+    def test_other_user_is_rejected(self):
+        self.authenticate(self.other)
+        self.assertEqual(self.client.get(f'/my-profile/profile/{self.owner.pk}/').status_code, 403)
+        response = self.client.patch(
+            f'/my-profile/profile/{self.owner.pk}/', {'name': 'x', 'gender': 'مرد'}, format='multipart'
+        )
+        self.assertEqual(response.status_code, 403)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ProfilePictureReplacementTests(APITestCase):
+    """Replacing or clearing the profile picture releases the old files' references."""
+
+    def setUp(self):
+        cache.clear()
+        self.owner = CustomUser.objects.create(phone_number='09120000001', selected_professional='Worker', is_verified=True)
+        self.profile = Profile.objects.create(
+            user=self.owner, name='علی', city='تهران', gender='مرد', description='d',
+            profile_picture=ContentFile(b'old jpg', name='old.jpg'),
+            profile_picture_webp=ContentFile(b'old webp', name='old.webp'),
+        )
+        self.old_names = [self.profile.profile_picture.name, self.profile.profile_picture_webp.name]
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {tokens_for_user(self.owner).access_token}')
+
+    def patch(self, data):
+        response = self.client.patch(
+            f'/my-profile/profile/{self.owner.pk}/', {'gender': 'مرد', **data}, format='multipart'
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def assertReleased(self):
+        self.assertFalse(StoredFile.objects.filter(name__in=self.old_names).exists())
+        self.assertFalse(any(default_storage.exists(name) for name in self.old_names))
+
+    def test_replacing_releases_old_files(self):
+        jpeg = BytesIO()
+        Image.new('RGB', (8, 8)).save(jpeg, 'JPEG')
+        self.patch({'profile_picture': SimpleUploadedFile('new.jpg', jpeg.getvalue(), content_type='image/jpeg')})
+        self.assertReleased()
+        self.profile.refresh_from_db()
+        self.assertTrue(default_storage.exists(self.profile.profile_picture.name))
+
+    def test_clearing_releases_old_files(self):
+        self.patch({'profile_picture': ''})
+        self.assertReleased()
+        self.profile.refresh_from_db()
+        self.assertFalse(self.profile.profile_picture)
@@ -1,5 +1,3 @@
-from django.conf import settings
-from django.conf.urls.static import static
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
@@ -12,4 +10,4 @@ router.register('profile', ProfileViewSet, basename='profiles')
 urlpatterns = [
     path('', include(router.urls)),
     path('skills/', get_skills, name='get-skills')
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+]
@@ -1,20 +1,21 @@
+import logging
+
 from rest_framework import viewsets, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.decorators import action
 from .permission import DenyProfileDeletion
 from .serializers import ProfileSerializer
-from .models import Profile, Sample_image
+from .models import IMAGE_PENDING, IMAGE_READY, Profile, Sample_image
+from .image_pipeline import enqueue_image_jobs, store_original
 from django.conf import settings
-from django.core.files.storage import default_storage
-from django.core.files.base import ContentFile
 from django.db import transaction
 import traceback
-import uuid
-import os
-import io
-from PIL import Image
 from rest_framework.decorators import api_view
+from reference.data import reference_response
+
+logger = logging.getLogger(__name__)
+
 
 class ProfileViewSet(viewsets.ModelViewSet):
     http_method_names = ['get', 'post', 'put', 'patch', 'delete']
@@ -82,30 +83,21 @@ class ProfileViewSet(viewsets.ModelViewSet):
                         status=status.HTTP_400_BAD_REQUEST
                     )
 
+                # Originals go to storage untouched; process_images renders them later.
+                # The transaction only covers the metadata rows.
                 if profile_picture:
-                    img = Image.open(profile_picture)
-                    if img.mode in ('RGBA', 'LA'):
-                        img = img.convert('RGB')
-                    output = io.BytesIO()
-                    img.save(output, format='JPEG', quality=75, optimize=True)
-                    compressed_image = ContentFile(output.getvalue(), name=f"{uuid.uuid4()}_compressed.jpg")
-                    serializer.validated_data['profile_picture'] = compressed_image
+                    serializer.validated_data['profile_picture'] = store_original(profile_picture, 'profile/picture')
+                    serializer.validated_data['picture_status'] = IMAGE_PENDING
+                sample_paths = [store_original(image, 'profile/sample') for image in sample_pictures]
 
                 with transaction.atomic():
                     profile = serializer.save()
-
-                    if sample_pictures:
-                        for image in sample_pictures:
-                            img = Image.open(image)
-                            if img.mode in ('RGBA', 'LA'):
-                                img = img.convert('RGB')
-                            output = io.BytesIO()
-                            img.save(output, format='JPEG', quality=75, optimize=True)
-                            compressed_image = ContentFile(output.getvalue(), name=f"{uuid.uuid4()}_compressed.jpg")
-                            sample_path = os.path.join('profile/sample', compressed_image.name)
-                            saved_path = default_storage.save(sample_path, compressed_image)
-                            Sample_image.objects.create(profile=profile, image=saved_path)
-                            print(f"Saved sample image: {saved_path}")
+                    samples = [
+                        Sample_image.objects.create(profile=profile, image=path, status=IMAGE_PENDING)
+                        for path in sample_paths
+                    ]
+                    enqueue_image_jobs(profile, picture=bool(profile_picture), samples=samples)
+                logger.info(f"Queued {len(samples) + bool(profile_picture)} image(s) for processing")
 
                 return Response(serializer.data, status=status.HTTP_201_CREATED)
             else:
@@ -141,32 +133,29 @@ class ProfileViewSet(viewsets.ModelViewSet):
                         status=status.HTTP_400_BAD_REQUEST
                     )
 
+                replaces_picture = bool(profile_picture) or request.data.get('profile_picture') == ''
                 if profile_picture:
-                    img = Image.open(profile_picture)
-                    if img.mode in ('RGBA', 'LA'):
-                        img = img.convert('RGB')
-                    output = io.BytesIO()
-                    img.save(output, format='JPEG', quality=75, optimize=True)
-                    compressed_image = ContentFile(output.getvalue(), name=f"{uuid.uuid4()}_compressed.jpg")
-                    serializer.validated_data['profile_picture'] = compressed_image
-                elif request.data.get('profile_picture') == '':
+                    serializer.validated_data['profile_picture'] = store_original(profile_picture, 'profile/picture')
+                    serializer.validated_data['profile_picture_webp'] = None
+                    serializer.validated_data['picture_status'] = IMAGE_PENDING
+                elif replaces_picture:
                     serializer.validated_data['profile_picture'] = None
+                    serializer.validated_data['profile_picture_webp'] = None
+                    serializer.validated_data['picture_status'] = IMAGE_READY
+                sample_paths = [store_original(image, 'profile/sample') for image in sample_pictures]
 
                 with transaction.atomic():
+                    if replaces_picture:
+                        # Drop the old picture's references; shared files stay until their last user is gone
+                        profile.profile_picture.delete(save=False)
+                        profile.profile_picture_webp.delete(save=False)
                     serializer.save()
-
-                    if sample_pictures:
-                        for image in sample_pictures:
-                            img = Image.open(image)
-                            if img.mode in ('RGBA', 'LA'):
-                                img = img.convert('RGB')
-                            output = io.BytesIO()
-                            img.save(output, format='JPEG', quality=75, optimize=True)
-                            compressed_image = ContentFile(output.getvalue(), name=f"{uuid.uuid4()}_compressed.jpg")
-                            sample_path = os.path.join('profile/sample', compressed_image.name)
-                            saved_path = default_storage.save(sample_path, compressed_image)
-                            Sample_image.objects.create(profile=profile, image=saved_path)
-                            print(f"Saved sample image: {saved_path}")
+                    samples = [
+                        Sample_image.objects.create(profile=profile, image=path, status=IMAGE_PENDING)
+                        for path in sample_paths
+                    ]
+                    enqueue_image_jobs(profile, picture=bool(profile_picture), samples=samples)
+                logger.info(f"Queued {len(samples) + bool(profile_picture)} image(s) for processing")
 
                 updated_serializer = self.get_serializer(profile, context={'request': request})
                 return Response(updated_serializer.data, status=status.HTTP_200_OK)
@@ -195,11 +184,12 @@ class ProfileViewSet(viewsets.ModelViewSet):
 
             try:
                 sample_image = Sample_image.objects.get(id=image_id, profile=profile)
-                image_path = os.path.join(settings.MEDIA_ROOT, str(sample_image.image))
-                if os.path.exists(image_path):
-                    os.remove(image_path)
+                # Drop this sample's references; shared files stay until their last user is gone
+                image_name = sample_image.image.name
+                sample_image.image.delete(save=False)
+                sample_image.image_webp.delete(save=False)
                 sample_image.delete()
-                print(f"Deleted sample image: {image_path}")
+                logger.info(f"Released sample image: {image_name}")
                 return Response({"status": "تصویر حذف شد"}, status=status.HTTP_200_OK)
             except Sample_image.DoesNotExist:
                 return Response({"error": "تصویر یافت نشد"}, status=status.HTTP_404_NOT_FOUND)
@@ -216,10 +206,4 @@ def get_skills(request):
     if not user.is_authenticated:
         return Response({"error": "User not authenticated"}, status=status.HTTP_401_UNAUTHORIZED)
 
-    try:
-        skills = [{'value': value, 'label': label} for value, label in settings.SKILL]
-        return Response({"skills": skills}, status=status.HTTP_200_OK)
-    except Exception as e:
-        print(f"Error in get_skills: {e}")
-        print(traceback.format_exc())
-        return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+    return reference_response(request, 'skill_options')
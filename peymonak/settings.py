@@ -35,6 +35,7 @@ INSTALLED_APPS = [
     'support',
     'register_ad',
     'saved_ads',
+    'reference',
 
 ]
 
@@ -100,6 +101,22 @@ DATABASES = {
         },
     }
 }
+# 'direct' opens a MySQL connection per request, 'persistent' keeps one per worker
+# thread with health checks, 'pooled' shares a bounded per-process pool
+# (utils.mysql_pool). Compare them with `manage.py benchmark_db_connections`.
+DB_CONNECTION_MODE = os.environ.get('DB_CONNECTION_MODE', 'direct')
+if DB_CONNECTION_MODE == 'persistent':
+    DATABASES['default'].update(CONN_MAX_AGE=600, CONN_HEALTH_CHECKS=True)
+elif DB_CONNECTION_MODE == 'pooled':
+    DATABASES['default'].update(
+        ENGINE='utils.mysql_pool',
+        POOL={
+            'SIZE': int(os.environ.get('DB_POOL_SIZE', '10')),
+            'MAX_OVERFLOW': int(os.environ.get('DB_POOL_MAX_OVERFLOW', '10')),
+            'TIMEOUT': 5,
+            'RECYCLE': 3600,
+        },
+    )
 import sys
 
 LOGGING = {
@@ -157,6 +174,69 @@ LOGGING = {
         },
     },
 }
+# OTP codes, token versions and user payloads are cached; with several worker
+# processes the cache must be shared, so set REDIS_CACHE_URL in production.
+if os.environ.get('REDIS_CACHE_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_CACHE_URL'],
+        }
+    }
+
+# Fraction of production requests that log listing queryset counts
+# (always on when DEBUG is True).
+QUERYSET_STATS_SAMPLE_RATE = float(os.environ.get('QUERYSET_STATS_SAMPLE_RATE', '0'))
+
+# 'register_ad.search.LikeSearchBackend' restores the unindexed icontains search
+AD_SEARCH_BACKEND = 'register_ad.search.InvertedIndexSearchBackend'
+
+# Province.visited_count increments are buffered and written every N seconds
+PROVINCE_VISIT_FLUSH_SECONDS = 10
+
+# SMS delivery: providers are tried in order by the `send_sms` outbox worker.
+# Use ['utils.sms.FakeSmsProvider'] to run the whole flow offline.
+SMS_PROVIDERS = [
+    'utils.sms.MelipayamakProvider',
+    'utils.sms.KavenegarProvider',
+]
+MELIPAYAMAK_USERNAME = os.environ.get('MELIPAYAMAK_USERNAME', '')
+MELIPAYAMAK_PASSWORD = os.environ.get('MELIPAYAMAK_PASSWORD', '')
+MELIPAYAMAK_FROM = os.environ.get('MELIPAYAMAK_FROM', '')
+KAVENEGAR_API_KEY = os.environ.get(
+    'KAVENEGAR_API_KEY',
+    '34673075556F7669507A552F5A6F616B37676C2F6E6364346F784D396D7777474E796C784C76763577346B3D',
+)
+KAVENEGAR_BASE_URL = 'https://api.kavenegar.com/v1/'
+MELIPAYAMAK_BASE_URL = 'https://rest.payamak-panel.com/api/SendSMS/'
+# (connect, read) timeouts and keep-alive pool size of the shared provider HTTP clients
+SMS_HTTP_TIMEOUT = (3.05, 10)
+SMS_HTTP_POOL_SIZE = 10
+SMS_MAX_ATTEMPTS = 5
+SMS_RETRY_BASE_SECONDS = 5
+SMS_RETRY_MAX_SECONDS = 300
+
+# OTP codes live in the cache (see core.otp); the user row is written only on success
+OTP_TTL_SECONDS = 300
+OTP_MAX_VERIFY_ATTEMPTS = 5
+OTP_RESEND_INTERVAL_SECONDS = 60
+OTP_PHONE_LIMIT_PER_HOUR = 5
+OTP_IP_LIMIT_PER_HOUR = 30
+# Request header carrying the client address set by the front server (e.g. 'X-Forwarded-For'
+# or 'X-Real-IP'); only set it when every request goes through that server. Empty uses REMOTE_ADDR.
+CLIENT_IP_HEADER = os.environ.get('CLIENT_IP_HEADER', '')
+# Proxies in front of Django that append to CLIENT_IP_HEADER
+TRUSTED_PROXY_COUNT = int(os.environ.get('TRUSTED_PROXY_COUNT', '1'))
+
+# Profile uploads are stored as-is and compressed by the `process_images` worker
+IMAGE_JOB_MAX_ATTEMPTS = 3
+IMAGE_JOB_RETRY_SECONDS = 60
+# CPU-bound image work (utils.images) runs in this many processes; below 2 it runs inline.
+# Uploads are downscaled to IMAGE_MAX_DIMENSION px on their longest side.
+IMAGE_PROCESS_WORKERS = min(4, os.cpu_count() or 1)
+IMAGE_PROCESS_TASKS_PER_CHILD = 100
+IMAGE_MAX_DIMENSION = 2048
+
 # peymonak/settings.py
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -174,20 +254,41 @@ USE_I18N = True
 USE_TZ = True
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'core.authentication.StatelessJWTAuthentication',
         'rest_framework.authentication.SessionAuthentication',  # For browsable API
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    # Browsable API only while developing; hot list views use utils.renderers.FAST_RENDERER_CLASSES
     'DEFAULT_RENDERER_CLASSES': [
         'rest_framework.renderers.JSONRenderer',
-        'rest_framework.renderers.BrowsableAPIRenderer',
+        *(['rest_framework.renderers.BrowsableAPIRenderer'] if DEBUG else []),
     ],
 }
 
 MEDIA_URL = '/images/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'images')
+# Uploads are named by content hash and deduplicated, with reference counts (utils.storage)
+STORAGES = {
+    'default': {
+        'BACKEND': 'utils.storage.ContentAddressedStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
+}
+# How /images/ is served: 'django' streams files itself (sendfile, ranges, ETags);
+# 'x-accel' (nginx) and 'x-sendfile' (Apache/lighttpd) only authorise and let the
+# front server send the file, e.g. for nginx:
+#   location /protected-media/ { internal; alias /path/to/images/; }
+#   location /protected-renditions/ { internal; alias /path/to/renditions/; }
+MEDIA_SERVING = os.environ.get('MEDIA_SERVING', 'django')
+MEDIA_ACCEL_PREFIX = '/protected-media/'
+RENDITION_ACCEL_PREFIX = '/protected-renditions/'
+# Resized image variants served by /renditions/ (utils.renditions), evicted LRU past the size limit
+RENDITION_CACHE_ROOT = os.path.join(BASE_DIR, 'renditions')
+RENDITION_CACHE_MAX_BYTES = 512 * 1024 * 1024
 
 STATIC_URL = 'static/'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
@@ -204,9 +305,14 @@ DJOSER = {
         'user_list': ['rest_framework.permissions.IsAuthenticated'],
     }
 }
+# Seconds a /auth/users/<id>/ payload stays cached (invalidated on CustomUser.save)
+USER_CACHE_TIMEOUT = 300
 # DJANGO_SETTINGS_MODULE=peymonak.settings
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=2),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
     'AUTH_HEADER_TYPES': ('Bearer',),
-}
\ No newline at end of file
+}
+# Seconds a user's token version is cached by StatelessJWTAuthentication;
+# revocations reach other processes within this window (immediately with a shared cache)
+TOKEN_VERSION_CACHE_TIMEOUT = 60
\ No newline at end of file
@@ -1,16 +1,18 @@
 from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib import admin
-from django.urls import path, include
-from core.views import CustomTokenObtainPairView, VerifyCodeView
+from django.urls import path, include, re_path
+from core.views import CustomTokenObtainPairView, VerifyCodeView, RevokeTokensView
 from rest_framework_simplejwt.views import TokenRefreshView
 from register_ad.views import get_current_user
 from core.views import request_verification_code  # Replace 'your_app' with your app name
+from utils.media import serve_media
+from utils.renditions import rendition
 
 urlpatterns = [
     path('api/token/', CustomTokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
-    path('auth/', include('djoser.urls')),
+    path('api/token/revoke/', RevokeTokensView.as_view(), name='token_revoke'),
+    path('auth/', include('core.auth_urls')),
     path('admin/', admin.site.urls),
     path('', include('core.urls')),
     path('provinces/', include('provinces.urls')),
@@ -18,7 +20,14 @@ urlpatterns = [
     path('saved-ads/', include('saved_ads.urls')),
     path('support/', include('support.urls')),
     path('register-ad/', include('register_ad.urls')),
+    path('reference/', include('reference.urls')),
     path('api/user/', get_current_user, name='get_current_user'),
     path('api/verify/', VerifyCodeView.as_view(), name='verify_code'),  # Add this line
     path('api/request-verification/', request_verification_code, name='request_verification'),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT, show_indexes=True)
+    path('renditions/<int:width>/<str:fmt>/<path:name>', rendition, name='rendition'),
+    # Uploads; in production the front server streams them (see MEDIA_SERVING)
+    re_path(rf'^{settings.MEDIA_URL.lstrip("/")}(?P<path>.+)$', serve_media, name='media'),
+    # Old per-app media mounts; stored URLs and older app versions still point at them
+    re_path(rf'^(?:register-ad|my-profile)/{settings.MEDIA_URL.lstrip("/")}(?P<path>.+)$', serve_media,
+            name='legacy-media'),
+]
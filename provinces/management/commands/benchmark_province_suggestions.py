@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+
+from provinces.modules.suggestion_index import get_suggestion_index
+from provinces.views import province_suggestions
+
+QUERIES = ['ت', 'تهر', 'شهر', 'اسلام شهر', 'كرمان', 'آباد', 'zz']
+
+
+class Command(BaseCommand):
+    help = "Measure the per-request cost of province suggestions in microseconds."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        index = get_suggestion_index()
+        index.get_popularity()
+        factory = RequestFactory()
+
+        self.stdout.write(f"{'query':<12} {'index us':>10} {'view us':>10}")
+        for query in QUERIES:
+            start = time.perf_counter()
+            for _ in range(iterations):
+                index.suggest(query)
+            index_us = (time.perf_counter() - start) / iterations * 1e6
+
+            request = factory.get('/provinces/api/check/suggestions/', {'name': query})
+            start = time.perf_counter()
+            for _ in range(iterations):
+                province_suggestions(request)
+            view_us = (time.perf_counter() - start) / iterations * 1e6
+
+            self.stdout.write(f"{query:<12} {index_us:>10.1f} {view_us:>10.1f}")
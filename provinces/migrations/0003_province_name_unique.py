@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:06
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def merge_duplicate_provinces(apps, schema_editor):
+    Province = apps.get_model('provinces', 'Province')
+    duplicates = (
+        Province.objects.values('name')
+        .annotate(rows=Count('pk'), total=Sum('visited_count'))
+        .filter(rows__gt=1)
+    )
+    for duplicate in list(duplicates):
+        rows = Province.objects.filter(name=duplicate['name']).order_by('pk')
+        keep = rows.first()
+        rows.exclude(pk=keep.pk).delete()
+        rows.update(visited_count=duplicate['total'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('provinces', '0002_province_name_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_provinces, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='province',
+            name='name',
+            field=models.CharField(max_length=50, unique=True),
+        ),
+    ]
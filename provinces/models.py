@@ -2,7 +2,7 @@ from django.db import models
 
 
 class Province(models.Model):
-    name = models.CharField(max_length=50)
+    name = models.CharField(max_length=50, unique=True)
     visited_count = models.PositiveIntegerField(default=0)
 
     def __str__(self):
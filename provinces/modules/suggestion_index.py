@@ -0,0 +1,86 @@
+import threading
+import time
+from functools import lru_cache
+
+from component.persian_text import normalize_key
+from provinces.modules.get_provinces_of_file_txt import Get_Provinces_of_File
+
+POPULARITY_TTL_SECONDS = 300
+
+
+class _Trie:
+    __slots__ = ('children', 'matches')
+
+    def __init__(self):
+        self.children = {}
+        self.matches = set()
+
+    def insert(self, key, value):
+        node = self
+        for char in key:
+            node = node.children.setdefault(char, _Trie())
+            node.matches.add(value)
+
+    def find(self, key):
+        node = self
+        for char in key:
+            node = node.children.get(char)
+            if node is None:
+                return set()
+        return node.matches
+
+
+class ProvinceSuggestionIndex:
+    """
+    Prefix and infix matching over normalised province names.
+    Prefix matches come first, then by Province.visited_count (refreshed every
+    POPULARITY_TTL_SECONDS), then by name.
+    """
+
+    def __init__(self, names):
+        self.names = sorted(names)
+        self.prefix_trie = _Trie()
+        self.infix_trie = _Trie()
+        for index, name in enumerate(self.names):
+            key = normalize_key(name)
+            self.prefix_trie.insert(key, index)
+            for start in range(1, len(key)):
+                self.infix_trie.insert(key[start:], index)
+        self.popularity = {}
+        self.popularity_loaded_at = None
+        self._lock = threading.Lock()
+
+    def suggest(self, query, limit=10):
+        key = normalize_key(query)
+        popularity = self.get_popularity()
+        if not key:
+            candidates = range(len(self.names))
+            prefix_matches = set()
+        else:
+            prefix_matches = self.prefix_trie.find(key)
+            candidates = prefix_matches | self.infix_trie.find(key)
+
+        def rank(index):
+            name = self.names[index]
+            return index not in prefix_matches, -popularity.get(name, 0), name
+
+        return [self.names[index] for index in sorted(candidates, key=rank)[:limit]]
+
+    def get_popularity(self):
+        loaded_at = self.popularity_loaded_at
+        if loaded_at is None or time.monotonic() - loaded_at > POPULARITY_TTL_SECONDS:
+            with self._lock:
+                if self.popularity_loaded_at is loaded_at:
+                    self.refresh_popularity()
+        return self.popularity
+
+    def refresh_popularity(self):
+        from provinces.models import Province
+
+        self.popularity = dict(Province.objects.values_list('name', 'visited_count'))
+        self.popularity_loaded_at = time.monotonic()
+
+
+@lru_cache(maxsize=None)
+def get_suggestion_index():
+    return ProvinceSuggestionIndex(Get_Provinces_of_File.PROVINCES)
@@ -0,0 +1,85 @@
+import atexit
+import logging
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Case, F, IntegerField, Value, When
+
+logger = logging.getLogger(__name__)
+
+
+class ProvinceVisitCounter:
+    """
+    Buffers Province.visited_count increments in memory and writes them in one
+    transaction every PROVINCE_VISIT_FLUSH_SECONDS, so requests never wait on
+    the hot province rows. Pending counts are flushed at interpreter exit.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.pending = Counter()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def increment(self, name, amount=1):
+        with self._lock:
+            self.pending[name] += amount
+            if self._thread is None:
+                self._start()
+
+    def _start(self):
+        self._thread = threading.Thread(target=self._run, name='province-visit-counter', daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Province visit flush failed: {e}")
+            finally:
+                connections.close_all()
+
+    def stop(self):
+        self._stopped.set()
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error(f"Province visit flush at shutdown failed: {e}")
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                batch, self.pending = self.pending, Counter()
+            if not batch:
+                return 0
+            try:
+                self._write(batch)
+            except Exception:
+                # Put the increments back so the next flush retries them
+                with self._lock:
+                    self.pending.update(batch)
+                raise
+            return sum(batch.values())
+
+    def _write(self, batch):
+        from provinces.models import Province
+
+        with transaction.atomic():
+            # Insert missing provinces first; the unique name makes concurrent inserts
+            # from other processes a no-op, and the increment below is a single UPDATE
+            Province.objects.bulk_create((Province(name=name) for name in batch), ignore_conflicts=True)
+            Province.objects.filter(name__in=batch).update(
+                visited_count=F('visited_count') + Case(
+                    *[When(name=name, then=Value(count)) for name, count in batch.items()],
+                    default=Value(0),
+                    output_field=IntegerField(),
+                )
+            )
+
+visit_counter = ProvinceVisitCounter(getattr(settings, 'PROVINCE_VISIT_FLUSH_SECONDS', 10))
@@ -1,3 +1,30 @@
+from django.db import IntegrityError
 from django.test import TestCase
 
-# Create your tests here.
+from .models import Province
+from .modules.visit_counter import ProvinceVisitCounter
+
+
+class ProvinceVisitCounterTests(TestCase):
+    def setUp(self):
+        self.counter = ProvinceVisitCounter(interval=60)
+
+    def test_flush_inserts_and_increments(self):
+        Province.objects.create(name='تهران', visited_count=5)
+        self.counter.pending.update({'تهران': 2, 'کرج': 3})
+        with self.assertNumQueries(4):  # savepoint, insert missing, increment, release
+            self.assertEqual(self.counter.flush(), 5)
+        self.assertEqual(dict(Province.objects.values_list('name', 'visited_count')), {'تهران': 7, 'کرج': 3})
+
+    def test_flushes_from_several_counters_do_not_duplicate(self):
+        other = ProvinceVisitCounter(interval=60)
+        self.counter.pending.update({'کرج': 1})
+        other.pending.update({'کرج': 2})
+        self.counter.flush()
+        other.flush()
+        self.assertEqual(list(Province.objects.values_list('name', 'visited_count')), [('کرج', 3)])
+
+    def test_name_is_unique(self):
+        Province.objects.create(name='کرج')
+        with self.assertRaises(IntegrityError):
+            Province.objects.create(name='کرج')
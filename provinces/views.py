@@ -1,14 +1,9 @@
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
-from provinces.modules.get_provinces_of_file_txt import Get_Provinces_of_File
-from .models import Province
-from django.db.models import F
-from django.db import transaction
-from django.db.utils import IntegrityError
-
-# Load provinces once when the module loads
-get_provinces_of_file = Get_Provinces_of_File()
+from provinces.modules.suggestion_index import get_suggestion_index
+from component.provinces import canonical_province
+from provinces.modules.visit_counter import visit_counter
 
 
 @api_view(['GET'])
@@ -21,49 +16,37 @@ def check_province(request):
             status=status.HTTP_400_BAD_REQUEST
         )
 
-    is_valid = province_name in get_provinces_of_file.PROVINCES
+    # Arabic/Persian spelling variants count towards the same province
+    canonical_name = canonical_province(province_name)
+    is_valid = canonical_name is not None
     response_data = {
         "valid": is_valid,
         "province": province_name
     }
 
     if is_valid:
-        try:
-            with transaction.atomic():
-                # add visited count
-                updated = Province.objects.filter(
-                    name=province_name
-                ).update(
-                    visited_count=F('visited_count') + 1
-                )
-
-                # If no records were updated, create a new one
-                if updated == 0:
-                    Province.objects.create(
-                        name=province_name,
-                        visited_count=1
-                    )
-
-        except IntegrityError:
-            # Handle race condition case
-            Province.objects.filter(
-                name=province_name
-            ).update(
-                visited_count=F('visited_count') + 1
-            )
+        # Counted in memory and written in batches by the visit counter
+        visit_counter.increment(canonical_name)
 
     return Response(response_data)
 
 
 """
 پیشنهاد کردن استانها برای بخش جست و جو
-    مثال: /api/check/suggestions/?name=تهران
+    مثال: /api/check/suggestions/?name=تهران&limit=10
 """
 
+SUGGESTIONS_DEFAULT_LIMIT = 10
+SUGGESTIONS_MAX_LIMIT = 50
+
 
 @api_view(['GET'])
 def province_suggestions(request):
-    get_provinces_of_file = Get_Provinces_of_File()
-    query = request.GET.get('q', '')
-    suggestions = [p for p in get_provinces_of_file.PROVINCES if query in p]
+    # `q` is still accepted for older app versions
+    query = request.GET.get('name', request.GET.get('q', ''))
+    try:
+        limit = min(int(request.GET.get('limit', SUGGESTIONS_DEFAULT_LIMIT)), SUGGESTIONS_MAX_LIMIT)
+    except ValueError:
+        limit = SUGGESTIONS_DEFAULT_LIMIT
+    suggestions = get_suggestion_index().suggest(query, limit=max(limit, 1))
     return Response({'suggestions': suggestions})
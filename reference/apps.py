@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class ReferenceConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'reference'
+
+    def ready(self):
+        # Serialise the reference lists once per process, at startup
+        from .data import get_payloads
+        get_payloads()
@@ -0,0 +1,52 @@
+import hashlib
+import json
+from functools import lru_cache
+
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+
+from component.gender import GENDER_CHOICES
+from component.provinces import PROVINCES
+from component.skill import SKILL
+from register_ad.models import COOPERATION_KIND
+
+REFERENCE_MAX_AGE = 60 * 60 * 24
+
+
+class ReferencePayload:
+    """Pre-rendered JSON body plus a strong ETag derived from its content."""
+
+    def __init__(self, data):
+        self.content = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        self.etag = f'"{hashlib.sha256(self.content).hexdigest()[:32]}"'
+
+
+@lru_cache(maxsize=None)
+def get_payloads():
+    lists = {
+        'provinces': PROVINCES,
+        'skills': SKILL,
+        'gender': GENDER_CHOICES,
+        'cooperation_kind': COOPERATION_KIND,
+    }
+    payloads = {name: ReferencePayload(data) for name, data in lists.items()}
+    payloads['skill_options'] = ReferencePayload(
+        {'skills': [{'value': value, 'label': label} for value, label in SKILL]}
+    )
+    version = hashlib.sha256(b''.join(payload.content for payload in payloads.values())).hexdigest()[:16]
+    payloads['bundle'] = ReferencePayload({'version': version, **lists})
+    return payloads
+
+
+def reference_response(request, name, public=False):
+    """Serve a cached reference payload, answering If-None-Match with 304."""
+    payload = get_payloads()[name]
+    response = get_conditional_response(request, etag=payload.etag)
+    if response is None:
+        response = HttpResponse(payload.content, content_type='application/json')
+    response['ETag'] = payload.etag
+    if public:
+        patch_cache_control(response, public=True, max_age=REFERENCE_MAX_AGE)
+    else:
+        patch_cache_control(response, private=True, max_age=REFERENCE_MAX_AGE)
+    return response
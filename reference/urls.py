@@ -0,0 +1,6 @@
+from django.urls import path
+from .views import reference_bundle
+
+urlpatterns = [
+    path('', reference_bundle, name='reference-bundle'),
+]
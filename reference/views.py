@@ -0,0 +1,12 @@
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
+from rest_framework.permissions import AllowAny
+
+from .data import reference_response
+
+
+@api_view(['GET'])
+@authentication_classes([])
+@permission_classes([AllowAny])
+def reference_bundle(request):
+    """Provinces, skills, gender and cooperation kinds in one cacheable response."""
+    return reference_response(request, 'bundle', public=True)
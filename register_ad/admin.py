@@ -1,8 +1,21 @@
 from django.contrib import admin
 
+from .deletion import delete_ads
 from .models import Register_Request, register_ad, Report_Register_Request, RegisterAdImage
 
+
+@admin.register(register_ad)
+class RegisterAdAdmin(admin.ModelAdmin):
+    actions = ['delete_with_images']
+
+    @admin.action(description="Delete selected ads and their image files")
+    def delete_with_images(self, request, queryset):
+        deleted, files = delete_ads(queryset)
+        self.message_user(request, f"{deleted} ads deleted, {files} image files queued for removal.")
+
+
 admin.site.register(Register_Request)
-admin.site.register(register_ad)
 admin.site.register(Report_Register_Request)
-admin.site.register(RegisterAdImage)
\ No newline at end of file
+
+
+admin.site.register(RegisterAdImage)
@@ -0,0 +1,34 @@
+import logging
+
+from django.db import transaction
+
+from utils.file_sweeper import file_sweeper
+from .models import RegisterAdImage, register_ad
+
+logger = logging.getLogger(__name__)
+
+
+def delete_ads(queryset):
+    """
+    Delete the ads in `queryset` with their images and related rows in one
+    transaction. Image files are collected in a single query and handed to the
+    background sweeper once the transaction commits, so a rollback never
+    leaves rows pointing at deleted files. Returns (ads deleted, files queued).
+    """
+    with transaction.atomic():
+        ad_ids = list(queryset.values_list('pk', flat=True))
+        if not ad_ids:
+            return 0, 0
+        file_names = list(
+            RegisterAdImage.objects
+            .filter(register_ad_id__in=ad_ids)
+            .exclude(image='')
+            .exclude(image__isnull=True)
+            .values_list('image', flat=True)
+        )
+        _, deleted = register_ad.objects.filter(pk__in=ad_ids).delete()
+        transaction.on_commit(lambda: file_sweeper.schedule(file_names))
+
+    ads_deleted = deleted.get(register_ad._meta.label, 0)
+    logger.info(f"Deleted {ads_deleted} ads, queued {len(file_names)} image files for removal")
+    return ads_deleted, len(file_names)
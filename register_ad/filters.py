@@ -1,9 +1,13 @@
 import django_filters
+from django import forms
 from django.contrib.auth import get_user_model
-from django.db import models
-from component.skill import SKILL
-from component.provinces import PROVINCES
-from register_ad.models import register_ad
+from component.jalali import parse_jalali_date
+from component.persian_text import normalize_key, normalize_persian
+from component.skill import canonical_skill
+from component.provinces import canonical_province
+from register_ad.models import AdListing, register_ad
+from register_ad.search import get_search_backend
+from utils.query_stats import log_queryset_stats
 import logging
 
 logger = logging.getLogger(__name__)
@@ -21,39 +25,67 @@ PROFESSIONAL_CHOICES = [
     ('Worker', 'کارگر'),
 ]
 
+class JalaliDateField(forms.DateField):
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        date = parse_jalali_date(value)
+        if date is None:
+            raise forms.ValidationError("تاریخ شمسی باید به شکل ۱۴۰۳/۰۱/۱۵ باشد.", code='invalid')
+        return date
+
+
+class JalaliDateFilter(django_filters.DateFilter):
+    """Takes a Jalali date and compares it, converted, against a Gregorian (indexed) date column."""
+    field_class = JalaliDateField
+
+
 class RegisterAdFilter(django_filters.FilterSet):
-    title = django_filters.CharFilter(lookup_expr='icontains')
+    title = django_filters.CharFilter(method='filter_by_title')
     user_name = django_filters.CharFilter(method='filter_by_all_fields', label='جستجو')
-    skill = django_filters.ChoiceFilter(choices=SKILL, lookup_expr='iexact')
-    province = django_filters.ChoiceFilter(choices=PROVINCES, lookup_expr='iexact')
-    city = django_filters.CharFilter(lookup_expr='iexact')
-    cooperation_kind = django_filters.ChoiceFilter(choices=COOPERATION_KIND, lookup_expr='iexact')
+    skill = django_filters.CharFilter(method='filter_by_skill')
+    province = django_filters.CharFilter(method='filter_by_province')
+    city = django_filters.CharFilter(method='filter_by_city')
+    cooperation_kind = django_filters.ChoiceFilter(choices=COOPERATION_KIND)
     created_at__gte = django_filters.DateFilter(field_name='created_at', lookup_expr='gte', label='از تاریخ')
     created_at__lte = django_filters.DateFilter(field_name='created_at', lookup_expr='lte', label='تا تاریخ')
+    created_at_jalali__gte = JalaliDateFilter(field_name='created_at', lookup_expr='gte', label='از تاریخ (شمسی)')
+    created_at_jalali__lte = JalaliDateFilter(field_name='created_at', lookup_expr='lte', label='تا تاریخ (شمسی)')
     selected_professional = django_filters.CharFilter(method='filter_by_professional', label='حرفه')
+    professional_field = 'user__selected_professional'
 
     class Meta:
         model = register_ad
-        fields = ['title', 'user_name', 'skill', 'province', 'city', 'cooperation_kind', 'created_at__gte', 'created_at__lte', 'selected_professional']
+        fields = ['title', 'user_name', 'skill', 'province', 'city', 'cooperation_kind', 'created_at__gte', 'created_at__lte', 'created_at_jalali__gte', 'created_at_jalali__lte', 'selected_professional']
 
     def filter_by_all_fields(self, queryset, name, value):
         logger.debug(f"Filtering by user_name with value: {value}")
-        search_terms = value.split() if value else []
-        if not search_terms:
+        if not value or not value.split():
             return queryset
+        return get_search_backend().search(queryset, value)
 
-        combined_query = models.Q()
-        for term in search_terms:
-            term_query = (
-                models.Q(title__icontains=term) |
-                models.Q(user__username__icontains=term) |
-                models.Q(user__name__icontains=term) |
-                models.Q(province__icontains=term) |
-                models.Q(city__icontains=term)
-            )
-            combined_query &= term_query
+    def filter_by_title(self, queryset, name, value):
+        value = normalize_persian(value)
+        if not value:
+            return queryset
+        return queryset.filter(title_normalized__contains=value)
 
-        return queryset.filter(combined_query)
+    def filter_by_skill(self, queryset, name, value):
+        skill = canonical_skill(value)
+        if skill is None:
+            logger.debug(f"Unknown skill: {value}")
+            return queryset.none()
+        return queryset.filter(skill=skill)
+
+    def filter_by_province(self, queryset, name, value):
+        province = canonical_province(value)
+        if province is None:
+            logger.debug(f"Unknown province: {value}")
+            return queryset.none()
+        return queryset.filter(province=province)
+
+    def filter_by_city(self, queryset, name, value):
+        return queryset.filter(city_normalized=normalize_key(value))
 
     def filter_by_professional(self, queryset, name, value):
         logger.debug(f"Filtering by selected_professional with value: {value}")
@@ -64,7 +96,7 @@ class RegisterAdFilter(django_filters.FilterSet):
         professional_values = [v for v in professional_values if v in valid_values]
         if not professional_values:
             return queryset
-        return queryset.filter(user__selected_professional__in=professional_values)
+        return queryset.filter(**{f'{self.professional_field}__in': professional_values})
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -73,7 +105,19 @@ class RegisterAdFilter(django_filters.FilterSet):
     @property
     def qs(self):
         parent = super().qs
-        ordering = self.request.GET.get('ordering', '-created_at')
+        ordering = self.request.GET.get('ordering')
+        log_queryset_stats(logger, "Filtered queryset", parent, level=logging.DEBUG)
+        if ordering is None and 'search_rank' in parent.query.annotations:
+            logger.debug("Applying search rank ordering")
+            return parent.order_by('-search_rank', '-created_at')
+        ordering = ordering or '-created_at'
         logger.debug(f"Applying ordering: {ordering}")
-        logger.debug(f"Filtered queryset count: {parent.count()}")
-        return parent.order_by(ordering)
\ No newline at end of file
+        return parent.order_by(ordering)
+
+
+class AdListingFilter(RegisterAdFilter):
+    """RegisterAdFilter over the ad_listing read model, which carries the owner's profession itself."""
+    professional_field = 'selected_professional'
+
+    class Meta(RegisterAdFilter.Meta):
+        model = AdListing
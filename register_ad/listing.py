@@ -0,0 +1,88 @@
+from django.db import connection
+from django.db.models import OuterRef, Subquery
+
+from my_profile.models import Profile
+from .models import AdListing, RegisterAdImage, register_ad
+
+LISTING_BATCH_SIZE = 500
+
+
+def listing_fields(ad, user, profile_gender, image_names):
+    """Column values of the ad_listing row for `ad`."""
+    return {
+        'id': ad.pk,
+        'ad_id': ad.pk,
+        'user_id': ad.user_id,
+        'user_name': user.username,
+        'selected_professional': user.selected_professional,
+        'name': ad.name,
+        'title': ad.title,
+        'description': ad.description,
+        'fee': ad.fee,
+        'phone_number': ad.phone_number,
+        'province': ad.province,
+        'city': ad.city,
+        'cooperation_kind': ad.cooperation_kind,
+        'skill': ad.skill,
+        'status': ad.status,
+        'gender': ad.gender,
+        'profile_gender': profile_gender,
+        'created_at': ad.created_at,
+        'created_at_jalali': ad.created_at_jalali,
+        'images': [name or None for name in image_names],
+        'title_normalized': ad.title_normalized,
+        'city_normalized': ad.city_normalized,
+    }
+
+
+def image_names_by_ad(ad_ids):
+    names = {}
+    rows = RegisterAdImage.objects.filter(register_ad_id__in=ad_ids).order_by('pk').values_list('register_ad_id', 'image')
+    for ad_id, name in rows:
+        names.setdefault(ad_id, []).append(name)
+    return names
+
+
+def save_listings(rows):
+    # MySQL upserts on any unique key and rejects an explicit conflict target
+    unique_fields = ['id'] if connection.features.supports_update_conflicts_with_target else None
+    AdListing.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=unique_fields,
+        update_fields=[field.name for field in AdListing._meta.concrete_fields if not field.primary_key],
+    )
+
+
+def refresh_listings(ad_ids):
+    """Rewrite the listing rows of the given ads in three queries; returns the number of rows written."""
+    ad_ids = set(ad_ids)
+    if not ad_ids:
+        return 0
+    profile_gender = Profile.objects.filter(user_id=OuterRef('user_id')).values('gender')[:1]
+    ads = (
+        register_ad.objects
+        .filter(pk__in=ad_ids)
+        .select_related('user')
+        .annotate(profile_gender=Subquery(profile_gender))
+    )
+    images = image_names_by_ad(ad_ids)
+    rows = [AdListing(**listing_fields(ad, ad.user, ad.profile_gender, images.get(ad.pk, []))) for ad in ads]
+    if rows:
+        save_listings(rows)
+    return len(rows)
+
+
+def refresh_user_listings(user_id):
+    return refresh_listings(register_ad.objects.filter(user_id=user_id).values_list('pk', flat=True))
+
+
+def rebuild_listings(batch_size=LISTING_BATCH_SIZE):
+    count = 0
+    batch = []
+    for ad_id in register_ad.objects.order_by('pk').values_list('pk', flat=True).iterator(chunk_size=batch_size):
+        batch.append(ad_id)
+        if len(batch) >= batch_size:
+            count += refresh_listings(batch)
+            batch = []
+    return count + refresh_listings(batch)
@@ -0,0 +1,116 @@
+import datetime
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from component.jalali import jalali_date
+
+from register_ad.listing import refresh_listings
+from register_ad.models import AdListing, register_ad
+from register_ad.pagination import KEYSET_ORDERINGS, AdKeysetPagination
+
+BENCHMARK_PHONE_NUMBER = '09000000000'
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare OFFSET page-number pagination with keyset pagination on the active ad listings. "
+        "Read-only unless --sizes is given, which seeds ads owned by a benchmark user to grow the "
+        "table to each size in turn and deletes them afterwards (unless --keep)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page-size', type=int, default=50)
+        parser.add_argument('--depths', default='0,0.25,0.5,0.75,0.99',
+                            help="Comma separated page positions as a fraction of the table.")
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--sizes', default='',
+                            help="Comma separated table sizes to seed up to and measure, e.g. 10000,100000,1000000.")
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help="Seeded ads per insert; each batch gets its own created_at day.")
+        parser.add_argument('--keep', action='store_true', help="Keep the seeded ads.")
+
+    def timed(self, func, repeat):
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best * 1000
+
+    def handle(self, *args, **options):
+        try:
+            sizes = sorted(int(size) for size in options['sizes'].split(',') if size.strip())
+        except ValueError:
+            raise CommandError("--sizes must be comma separated integers")
+        if not sizes:
+            self.measure(options)
+            return
+
+        user, _ = get_user_model().objects.get_or_create(
+            phone_number=BENCHMARK_PHONE_NUMBER,
+            defaults={'username': 'pagination-benchmark', 'selected_professional': 'Worker'},
+        )
+        try:
+            for size in sizes:
+                self.seed(user, size, options['batch_size'])
+                self.measure(options)
+        finally:
+            if not options['keep']:
+                AdListing.objects.filter(user=user).delete()
+                register_ad.objects.filter(user=user).delete()
+                user.delete()
+
+    def seed(self, user, size, batch_size):
+        """Insert ads (and their listing rows) until there are `size` active listings."""
+        missing = size - AdListing.objects.filter(status='active').count()
+        oldest = AdListing.objects.order_by('created_at').values_list('created_at', flat=True).first()
+        day = oldest or datetime.date.today()
+        start = time.perf_counter()
+        while missing > 0:
+            count = min(batch_size, missing)
+            last_pk = register_ad.objects.order_by('-pk').values_list('pk', flat=True).first() or 0
+            register_ad.objects.bulk_create(
+                register_ad(
+                    user=user, name='بنچمارک', selected_professional='Worker', title=f'آگهی آزمایشی {index}',
+                    description='-', gender='مرد', fee='توافقی', phone_number=BENCHMARK_PHONE_NUMBER,
+                    province='تهران', city='تهران', skill='نقاش', status='active',
+                )
+                for index in range(count)
+            )
+            # bulk_create does not return ids on MySQL, so find the new rows again
+            ads = register_ad.objects.filter(user=user, pk__gt=last_pk)
+            day -= datetime.timedelta(days=1)
+            ads.update(created_at=day, created_at_jalali=jalali_date(day))
+            refresh_listings(ads.values_list('pk', flat=True))
+            missing -= count
+        self.stdout.write(f"seeded up to {size} active ads in {time.perf_counter() - start:.1f}s")
+
+    def measure(self, options):
+        page_size = options['page_size']
+        repeat = options['repeat']
+        queryset = AdListing.objects.filter(status='active').order_by('-created_at', '-id')
+        total = queryset.count()
+        self.stdout.write(f"active ads: {total}, page size: {page_size}")
+        if not total:
+            return
+
+        keyset = AdKeysetPagination()
+        keyset.ordering = KEYSET_ORDERINGS['-created_at']
+
+        self.stdout.write(f"{'offset':>10} {'offset ms':>12} {'keyset ms':>12}")
+        for depth in options['depths'].split(','):
+            offset = min(int(total * float(depth)), max(total - page_size, 0))
+
+            offset_ms = self.timed(lambda: list(queryset[offset:offset + page_size]), repeat)
+
+            if offset:
+                created_at, pk = queryset.values_list('created_at', 'id')[offset - 1]
+                page = queryset.filter(keyset.position_filter((created_at, pk)))
+            else:
+                page = queryset
+            keyset_ms = self.timed(lambda: list(page[:page_size]), repeat)
+
+            self.stdout.write(f"{offset:>10} {offset_ms:>12.2f} {keyset_ms:>12.2f}")
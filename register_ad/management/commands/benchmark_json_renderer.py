@@ -0,0 +1,70 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from register_ad.models import AdListing
+from register_ad.serializers import ActiveAdListingSerializer
+from utils import renderers
+from utils.renderers import FastJSONRenderer
+
+SAMPLE_LISTING = AdListing(
+    id=1, ad_id=1, user_id=1, user_name='نمونه', selected_professional='Worker', name='علی رضایی',
+    title='نقاشی ساختمان با بهترین کیفیت', description='اجرای نقاشی داخلی و خارجی ساختمان، ' * 6,
+    fee='توافقی', phone_number='09120000000', province='تهران', city='اسلام‌شهر', cooperation_kind='فرد',
+    skill='نقاش', status='active', gender='مرد', created_at_jalali='1403/01/15',
+    images=['files/ab/cd/abcd0123456789.jpg', 'files/ef/01/ef0123456789ab.jpg'],
+)
+
+
+class Command(BaseCommand):
+    help = "Compare render time and payload size of the JSON renderers on one page of active ad listings (read-only)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page-size', type=int, default=1000)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def timed(self, func, repeat):
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best * 1000
+
+    def page(self, page_size):
+        listings = list(AdListing.objects.filter(status='active').order_by('-created_at', '-id')[:page_size])
+        if not listings:
+            self.stdout.write("no active ads, using a sample listing")
+            listings = [SAMPLE_LISTING]
+        # Repeat the rows we have up to a full page
+        listings = (listings * (page_size // len(listings) + 1))[:page_size]
+        return {'next': None, 'results': ActiveAdListingSerializer(listings, many=True).data}
+
+    def stdlib_fallback(self, data):
+        orjson, renderers.orjson = renderers.orjson, None
+        try:
+            return FastJSONRenderer().render(data)
+        finally:
+            renderers.orjson = orjson
+
+    def handle(self, *args, **options):
+        data = self.page(options['page_size'])
+        repeat = options['repeat']
+        candidates = [
+            ('json.dumps (ascii escapes)', lambda: json.dumps(data).encode()),
+            ('JSONRenderer', lambda: JSONRenderer().render(data)),
+            ('FastJSONRenderer (stdlib)', lambda: self.stdlib_fallback(data)),
+        ]
+        if renderers.orjson is not None:
+            candidates.append(('FastJSONRenderer (orjson)', lambda: FastJSONRenderer().render(data)))
+        else:
+            self.stdout.write("orjson is not installed; FastJSONRenderer uses the stdlib encoder")
+
+        self.stdout.write(f"{len(data['results'])} ads per page, best of {repeat}")
+        self.stdout.write(f"{'renderer':<28} {'ms':>10} {'bytes':>12}")
+        for label, render in candidates:
+            size = len(render())
+            self.stdout.write(f"{label:<28} {self.timed(render, repeat):>10.2f} {size:>12}")
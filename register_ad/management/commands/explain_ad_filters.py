@@ -0,0 +1,67 @@
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import RequestFactory
+
+from register_ad.filters import AdListingFilter
+from register_ad.models import AdListing
+
+# Filter combinations the app sends to active-ads/ and register-ad/register/
+COMMON_FILTERS = [
+    {},
+    {'province': 'تهران'},
+    {'city': 'تهران'},
+    {'skill': 'نقاش'},
+    {'cooperation_kind': 'فرد'},
+    {'province': 'تهران', 'created_at__gte': '2025-01-01'},
+    {'skill': 'نقاش', 'created_at__gte': '2025-01-01', 'created_at__lte': '2025-12-31'},
+    {'selected_professional': 'Worker'},
+    {'created_at_jalali__gte': '1404/01/01'},
+]
+
+TABLE = AdListing._meta.db_table
+FULL_SCAN_PATTERNS = {
+    'mysql': re.compile(r'"access_type":\s*"ALL"'),
+    'sqlite': re.compile(rf'\bSCAN {TABLE}\b(?! USING)'),
+    'postgresql': re.compile(rf'Seq Scan on {TABLE}\b'),
+}
+
+
+class Command(BaseCommand):
+    help = "EXPLAIN the common AdListingFilter combinations on ad_listing and report any that fall back to a full table scan."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verbose-plan', action='store_true', help="Print the full plan for every query.")
+
+    def explain(self, params):
+        request = RequestFactory().get('/register-ad/active-ads/', params)
+        queryset = AdListing.objects.filter(status='active')
+        filterset = AdListingFilter(data=params, queryset=queryset, request=request)
+        if not filterset.is_valid():
+            raise CommandError(f"Invalid filter {params}: {filterset.errors}")
+        qs = filterset.qs
+        if connection.vendor == 'mysql':
+            return qs.explain(format='json')
+        return qs.explain()
+
+    def handle(self, *args, **options):
+        pattern = FULL_SCAN_PATTERNS.get(connection.vendor)
+        if pattern is None:
+            raise CommandError(f"Unsupported database backend: {connection.vendor}")
+
+        full_scans = 0
+        for params in COMMON_FILTERS:
+            plan = self.explain(params)
+            full_scan = bool(pattern.search(plan))
+            full_scans += full_scan
+            label = ', '.join(f'{k}={v}' for k, v in params.items()) or 'status only'
+            if full_scan:
+                self.stdout.write(self.style.ERROR(f"FULL SCAN  {label}"))
+            else:
+                self.stdout.write(self.style.SUCCESS(f"index      {label}"))
+            if options['verbose_plan'] or full_scan:
+                self.stdout.write(plan)
+
+        if full_scans:
+            raise CommandError(f"{full_scans} filter combination(s) use a full table scan.")
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from register_ad.listing import LISTING_BATCH_SIZE, rebuild_listings
+
+
+class Command(BaseCommand):
+    help = "Rebuild the ad_listing read model from the ad, user, profile and image tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=LISTING_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        count = rebuild_listings(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} ad listings."))
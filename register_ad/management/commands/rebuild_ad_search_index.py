@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from register_ad.models import register_ad
+from register_ad.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = "Rebuild the ad search index from the ad table."
+
+    def handle(self, *args, **options):
+        count = get_search_backend().rebuild(register_ad.objects.all())
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} ads."))
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:07
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('register_ad', '0032_alter_register_ad_created_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='register_ad',
+            index=models.Index(fields=['created_at'], name='ad_created_5ef642_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='register_ad',
+            index=models.Index(fields=['status', 'created_at'], name='ad_status_836c73_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='register_ad',
+            index=models.Index(fields=['status', 'province', 'created_at'], name='ad_status_61021d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='register_ad',
+            index=models.Index(fields=['status', 'city', 'created_at'], name='ad_status_c118cf_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='register_ad',
+            index=models.Index(fields=['status', 'skill', 'created_at'], name='ad_status_0820db_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='register_ad',
+            index=models.Index(fields=['status', 'cooperation_kind', 'created_at'], name='ad_status_aad650_idx'),
+        ),
+    ]
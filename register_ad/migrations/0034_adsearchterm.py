@@ -0,0 +1,88 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:09
+
+import re
+import unicodedata
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# Frozen copy of component.persian_text as of this migration
+PERSIAN_CHARACTER_MAP = str.maketrans({
+    'ي': 'ی',
+    'ى': 'ی',
+    'ئ': 'ی',
+    'ك': 'ک',
+    'ة': 'ه',
+    'ۀ': 'ه',
+    'أ': 'ا',
+    'إ': 'ا',
+    'ٱ': 'ا',
+    'ؤ': 'و',
+    '\u0640': '',
+    '\u200c': '',
+    '\u200d': '',
+    '\u200f': '',
+    '\u200e': '',
+    **{chr(0x06F0 + i): str(i) for i in range(10)},
+    **{chr(0x0660 + i): str(i) for i in range(10)},
+})
+DIACRITICS_PATTERN = re.compile('[\u064b-\u065f\u0670]')
+TOKEN_SPLIT_PATTERN = re.compile(r'[\s_\-،,.;:!?؟()\[\]"\'/\\]+')
+FIELD_WEIGHTS = {'title': 3, 'name': 2, 'username': 2, 'province': 1, 'city': 1}
+
+
+def normalize_persian(text):
+    if not text:
+        return ''
+    text = unicodedata.normalize('NFKC', str(text))
+    text = DIACRITICS_PATTERN.sub('', text)
+    text = text.translate(PERSIAN_CHARACTER_MAP)
+    return ' '.join(text.lower().split())
+
+
+def ad_search_terms(**fields):
+    terms = {}
+    for field, weight in FIELD_WEIGHTS.items():
+        for token in TOKEN_SPLIT_PATTERN.split(normalize_persian(fields.get(field))):
+            if token:
+                token = token[:64]
+                terms[token] = max(terms.get(token, 0), weight)
+    return terms
+
+
+def build_search_index(apps, schema_editor):
+    RegisterAd = apps.get_model('register_ad', 'register_ad')
+    AdSearchTerm = apps.get_model('register_ad', 'AdSearchTerm')
+    for ad in RegisterAd.objects.select_related('user').iterator(chunk_size=500):
+        terms = ad_search_terms(
+            title=ad.title, name=ad.name, username=ad.user.username, province=ad.province, city=ad.city
+        )
+        AdSearchTerm.objects.bulk_create(
+            AdSearchTerm(ad_id=ad.pk, term=term, weight=weight) for term, weight in terms.items()
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('register_ad', '0033_register_ad_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AdSearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64)),
+                ('weight', models.PositiveSmallIntegerField(default=1)),
+                ('ad', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to='register_ad.register_ad')),
+            ],
+            options={
+                'db_table': 'ad_search_term',
+                'indexes': [models.Index(fields=['term', 'ad'], name='ad_search_t_term_c25588_idx')],
+                'unique_together': {('ad', 'term')},
+            },
+        ),
+        migrations.RunPython(build_search_index, migrations.RunPython.noop),
+    ]
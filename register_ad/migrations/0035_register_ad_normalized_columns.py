@@ -0,0 +1,83 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:10
+
+import re
+import unicodedata
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+# Frozen copy of component.persian_text as of this migration
+PERSIAN_CHARACTER_MAP = str.maketrans({
+    'ي': 'ی',
+    'ى': 'ی',
+    'ئ': 'ی',
+    'ك': 'ک',
+    'ة': 'ه',
+    'ۀ': 'ه',
+    'أ': 'ا',
+    'إ': 'ا',
+    'ٱ': 'ا',
+    'ؤ': 'و',
+    '\u0640': '',
+    '\u200c': '',
+    '\u200d': '',
+    '\u200f': '',
+    '\u200e': '',
+    **{chr(0x06F0 + i): str(i) for i in range(10)},
+    **{chr(0x0660 + i): str(i) for i in range(10)},
+})
+DIACRITICS_PATTERN = re.compile('[\u064b-\u065f\u0670]')
+KEY_STRIP_PATTERN = re.compile(r'[\s_]+')
+
+
+def normalize_persian(text):
+    if not text:
+        return ''
+    text = unicodedata.normalize('NFKC', str(text))
+    text = DIACRITICS_PATTERN.sub('', text)
+    text = text.translate(PERSIAN_CHARACTER_MAP)
+    return ' '.join(text.lower().split())
+
+
+def normalize_key(text):
+    return KEY_STRIP_PATTERN.sub('', normalize_persian(text))
+
+
+def fill_normalized_columns(apps, schema_editor):
+    RegisterAd = apps.get_model('register_ad', 'register_ad')
+    for ad in RegisterAd.objects.only('title', 'city').iterator(chunk_size=500):
+        RegisterAd.objects.filter(pk=ad.pk).update(
+            title_normalized=normalize_persian(ad.title)[:100],
+            city_normalized=normalize_key(ad.city)[:64],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('register_ad', '0034_adsearchterm'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='register_ad',
+            name='ad_status_c118cf_idx',
+        ),
+        migrations.AddField(
+            model_name='register_ad',
+            name='city_normalized',
+            field=models.CharField(default='', editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='register_ad',
+            name='title_normalized',
+            field=models.CharField(default='', editable=False, max_length=100),
+        ),
+        migrations.RunPython(fill_normalized_columns, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='register_ad',
+            index=models.Index(fields=['status', 'city_normalized', 'created_at'], name='ad_status_c2ecc9_idx'),
+        ),
+    ]
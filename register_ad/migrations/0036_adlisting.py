@@ -0,0 +1,96 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:34
+
+import django.db.models.deletion
+import jdatetime
+from django.conf import settings
+from django.db import migrations, models
+
+
+BATCH_SIZE = 500
+
+
+def build_listings(apps, schema_editor):
+    RegisterAd = apps.get_model('register_ad', 'register_ad')
+    RegisterAdImage = apps.get_model('register_ad', 'RegisterAdImage')
+    AdListing = apps.get_model('register_ad', 'AdListing')
+    Profile = apps.get_model('my_profile', 'Profile')
+    genders = {}
+    for user_id, gender in Profile.objects.order_by('-pk').values_list('user_id', 'gender'):
+        genders[user_id] = gender
+    images = {}
+    for ad_id, name in RegisterAdImage.objects.order_by('pk').values_list('register_ad_id', 'image'):
+        images.setdefault(ad_id, []).append(name or None)
+    AdListing.objects.bulk_create(
+        (
+            AdListing(
+                id=ad.pk,
+                ad_id=ad.pk,
+                user_id=ad.user_id,
+                user_name=ad.user.username,
+                selected_professional=ad.user.selected_professional,
+                name=ad.name,
+                title=ad.title,
+                description=ad.description,
+                fee=ad.fee,
+                phone_number=ad.phone_number,
+                province=ad.province,
+                city=ad.city,
+                cooperation_kind=ad.cooperation_kind,
+                skill=ad.skill,
+                status=ad.status,
+                gender=ad.gender,
+                profile_gender=genders.get(ad.user_id),
+                created_at=ad.created_at,
+                created_at_jalali=jdatetime.date.fromgregorian(date=ad.created_at).strftime('%Y/%m/%d'),
+                images=images.get(ad.pk, []),
+                title_normalized=ad.title_normalized,
+                city_normalized=ad.city_normalized,
+            )
+            for ad in RegisterAd.objects.select_related('user').iterator(chunk_size=BATCH_SIZE)
+        ),
+        batch_size=BATCH_SIZE,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('my_profile', '0003_image_processing_status'),
+        ('register_ad', '0035_register_ad_normalized_columns'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AdListing',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('user_name', models.CharField(max_length=150)),
+                ('selected_professional', models.CharField(max_length=100)),
+                ('name', models.CharField(max_length=100)),
+                ('title', models.CharField(max_length=38)),
+                ('description', models.TextField()),
+                ('fee', models.CharField(max_length=20)),
+                ('phone_number', models.CharField(max_length=20)),
+                ('province', models.CharField(max_length=30)),
+                ('city', models.CharField(max_length=45)),
+                ('cooperation_kind', models.CharField(blank=True, max_length=25, null=True)),
+                ('skill', models.CharField(blank=True, max_length=45, null=True)),
+                ('status', models.CharField(max_length=10)),
+                ('gender', models.CharField(max_length=3)),
+                ('profile_gender', models.CharField(blank=True, max_length=40, null=True)),
+                ('created_at', models.DateField()),
+                ('created_at_jalali', models.CharField(max_length=10)),
+                ('images', models.JSONField(default=list)),
+                ('title_normalized', models.CharField(default='', max_length=100)),
+                ('city_normalized', models.CharField(default='', max_length=64)),
+                ('ad', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='listing', to='register_ad.register_ad')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'ad_listing',
+                'indexes': [models.Index(fields=['created_at'], name='ad_listing_created_3a3f41_idx'), models.Index(fields=['status', 'created_at'], name='ad_listing_status_14a094_idx'), models.Index(fields=['status', 'province', 'created_at'], name='ad_listing_status_8dbb2e_idx'), models.Index(fields=['status', 'city_normalized', 'created_at'], name='ad_listing_status_3a1677_idx'), models.Index(fields=['status', 'skill', 'created_at'], name='ad_listing_status_c8a183_idx'), models.Index(fields=['status', 'cooperation_kind', 'created_at'], name='ad_listing_status_2c72f9_idx'), models.Index(fields=['status', 'selected_professional', 'created_at'], name='ad_listing_status_ef88fd_idx')],
+            },
+        ),
+        migrations.RunPython(build_listings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:36
+
+import jdatetime
+from django.db import migrations, models
+
+
+def fill_created_at_jalali(apps, schema_editor):
+    RegisterAd = apps.get_model('register_ad', 'register_ad')
+    # One update per distinct day rather than per ad
+    for day in RegisterAd.objects.order_by().values_list('created_at', flat=True).distinct():
+        RegisterAd.objects.filter(created_at=day).update(
+            created_at_jalali=jdatetime.date.fromgregorian(date=day).strftime('%Y/%m/%d')
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('register_ad', '0036_adlisting'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='register_ad',
+            name='created_at_jalali',
+            field=models.CharField(default='', editable=False, max_length=10),
+        ),
+        migrations.RunPython(fill_created_at_jalali, migrations.RunPython.noop),
+    ]
@@ -1,9 +1,13 @@
+import datetime
+
 from django.db import models
 from django.conf import settings
 from django.utils import timezone
 from component.provinces import PROVINCES
 from component.skill import SKILL
 from component.gender import GENDER_CHOICES
+from component.jalali import jalali_date
+from component.persian_text import normalize_key, normalize_persian
 
 COOPERATION_KIND = [
     ('فرد', 'فرد'),
@@ -31,13 +35,42 @@ class register_ad(models.Model):
     skill = models.CharField(max_length=45, choices=SKILL, null=True, blank=True)
     created_at = models.DateField(auto_now_add=True)
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='active')
+    # Normalised shadow columns used by RegisterAdFilter for exact/indexed matching
+    title_normalized = models.CharField(max_length=100, editable=False, default='')
+    city_normalized = models.CharField(max_length=64, editable=False, default='')
+    # created_at as shown to users (YYYY/MM/DD Jalali), written with the row
+    created_at_jalali = models.CharField(max_length=10, editable=False, default='')
 
     class Meta:
         db_table = 'ad'
+        # Access paths used by RegisterAdFilter; created_at last so that
+        # ordering (and keyset pagination) by created_at is served by the index.
+        indexes = [
+            models.Index(fields=['created_at']),
+            models.Index(fields=['status', 'created_at']),
+            models.Index(fields=['status', 'province', 'created_at']),
+            models.Index(fields=['status', 'city_normalized', 'created_at']),
+            models.Index(fields=['status', 'skill', 'created_at']),
+            models.Index(fields=['status', 'cooperation_kind', 'created_at']),
+        ]
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        self.title_normalized = normalize_persian(self.title)[:100]
+        self.city_normalized = normalize_key(self.city)[:64]
+        # auto_now_add fills created_at while inserting, with the same date.today()
+        self.created_at_jalali = jalali_date(self.created_at or datetime.date.today())
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'title_normalized', 'city_normalized', 'created_at_jalali'}
+        super().save(*args, **kwargs)
+        if self.created_at_jalali != jalali_date(self.created_at):
+            # Inserted across midnight; saved again so the post_save copies (ad_listing) follow
+            self.created_at_jalali = jalali_date(self.created_at)
+            super().save(update_fields=['created_at_jalali'])
+
 
 class Register_Request(models.Model):
     ad = models.ForeignKey(register_ad, on_delete=models.CASCADE)
@@ -71,3 +104,64 @@ class RegisterAdImage(models.Model):
 
     def __str__(self):
         return f"Image for {self.register_ad.title}"
+
+
+class AdSearchTerm(models.Model):
+    """Inverted index row: one normalised token of an ad's searchable text."""
+    ad = models.ForeignKey(register_ad, related_name='search_terms', on_delete=models.CASCADE)
+    term = models.CharField(max_length=64)
+    weight = models.PositiveSmallIntegerField(default=1)
+
+    class Meta:
+        db_table = 'ad_search_term'
+        unique_together = ('ad', 'term')
+        indexes = [
+            models.Index(fields=['term', 'ad']),
+        ]
+
+
+class AdListing(models.Model):
+    """
+    Read model behind the ad listing endpoints: one row per ad carrying everything the
+    listing serializers emit (owner, profile gender, image names, Jalali date), so a
+    listing page reads this table alone. Kept in sync by register_ad.signals and rebuilt
+    with the `rebuild_ad_listings` command.
+    """
+    id = models.BigIntegerField(primary_key=True)  # always equal to ad_id
+    ad = models.OneToOneField(register_ad, related_name='listing', on_delete=models.CASCADE)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, related_name='+', on_delete=models.CASCADE)
+    user_name = models.CharField(max_length=150)
+    selected_professional = models.CharField(max_length=100)
+    name = models.CharField(max_length=100)
+    title = models.CharField(max_length=38)
+    description = models.TextField()
+    fee = models.CharField(max_length=20)
+    phone_number = models.CharField(max_length=20)
+    province = models.CharField(max_length=30)
+    city = models.CharField(max_length=45)
+    cooperation_kind = models.CharField(max_length=25, null=True, blank=True)
+    skill = models.CharField(max_length=45, null=True, blank=True)
+    status = models.CharField(max_length=10)
+    gender = models.CharField(max_length=3)
+    profile_gender = models.CharField(max_length=40, null=True, blank=True)
+    created_at = models.DateField()
+    created_at_jalali = models.CharField(max_length=10)
+    images = models.JSONField(default=list)
+    title_normalized = models.CharField(max_length=100, default='')
+    city_normalized = models.CharField(max_length=64, default='')
+
+    class Meta:
+        db_table = 'ad_listing'
+        # Same access paths as the ad table, plus the owner's profession
+        indexes = [
+            models.Index(fields=['created_at']),
+            models.Index(fields=['status', 'created_at']),
+            models.Index(fields=['status', 'province', 'created_at']),
+            models.Index(fields=['status', 'city_normalized', 'created_at']),
+            models.Index(fields=['status', 'skill', 'created_at']),
+            models.Index(fields=['status', 'cooperation_kind', 'created_at']),
+            models.Index(fields=['status', 'selected_professional', 'created_at']),
+        ]
+
+    def __str__(self):
+        return self.title
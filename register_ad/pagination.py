@@ -0,0 +1,152 @@
+import datetime
+from base64 import b64decode, b64encode
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination, PageNumberPagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+# ordering values accepted by RegisterAdFilter.qs -> keyset columns
+KEYSET_ORDERINGS = {
+    '-created_at': ('-created_at', '-id'),
+    'created_at': ('created_at', 'id'),
+    '-id': ('-id',),
+    'id': ('id',),
+}
+
+
+class StandardResultsSetPagination(PageNumberPagination):
+    page_size = 1000  # Default to 10
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+
+
+class AdKeysetPagination(BasePagination):
+    """
+    Cursor pagination over ``(created_at, id)``.
+    Each page is a single indexed range query, so deep pages cost the same as the first one.
+    """
+    cursor_query_param = 'cursor'
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    ordering_query_param = 'ordering'
+    default_ordering = '-created_at'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(request)
+
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(request)
+        if position is not None:
+            queryset = queryset.filter(self.position_filter(position))
+
+        results = list(queryset[:self.page_size + 1])
+        self.has_next = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        return self.page
+
+    def get_page_size(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param],
+                strict=True,
+                cutoff=self.max_page_size
+            )
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def get_ordering(self, request):
+        ordering = request.query_params.get(self.ordering_query_param, self.default_ordering)
+        if ordering not in KEYSET_ORDERINGS:
+            raise ValidationError({self.ordering_query_param: f"مرتب‌سازی باید یکی از {list(KEYSET_ORDERINGS)} باشد."})
+        return KEYSET_ORDERINGS[ordering]
+
+    def position_filter(self, position):
+        created_at, pk = position
+        descending = self.ordering[0].startswith('-')
+        op = 'lt' if descending else 'gt'
+        if len(self.ordering) == 1:
+            return Q(**{f'id__{op}': pk})
+        # The outer created_at bound gives the (status, created_at) index a range to seek to;
+        # with only the OR, deep pages scan every row before the cursor
+        return Q(**{f'created_at__{op}e': created_at}) & (
+            Q(**{f'created_at__{op}': created_at}) | Q(**{f'id__{op}': pk})
+        )
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            created_at, pk = b64decode(encoded.encode('ascii')).decode('ascii').split('|')
+            return datetime.date.fromisoformat(created_at), int(pk)
+        except (TypeError, ValueError):
+            raise NotFound('Invalid cursor')
+
+    def encode_cursor(self, instance):
+        raw = f'{instance.created_at.isoformat()}|{instance.pk}'
+        return b64encode(raw.encode('ascii')).decode('ascii')
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+class AdListPagination(BasePagination):
+    """
+    Page-number pagination by default; switches to keyset pagination when the
+    client sends a ``cursor`` parameter (empty for the first page), unless the
+    results are ordered by search rank.
+    """
+    page_number_class = StandardResultsSetPagination
+    keyset_class = AdKeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.keyset_class.cursor_query_param in request.query_params and not self.rank_ordered(queryset):
+            self.paginator = self.keyset_class()
+        else:
+            self.paginator = self.page_number_class()
+        return self.paginator.paginate_queryset(queryset, request, view=view)
+
+    def rank_ordered(self, queryset):
+        # Search results ordered by relevance have no (created_at, id) position to resume
+        # from, so they stay on page numbers rather than being silently re-sorted
+        return any(field.lstrip('-') == 'search_rank' for field in queryset.query.order_by)
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return self.page_number_class().get_paginated_response_schema(schema)
+
+    @property
+    def display_page_controls(self):
+        return getattr(getattr(self, 'paginator', None), 'display_page_controls', False)
+
+    def to_html(self):
+        return self.paginator.to_html()
+
+    def get_results(self, data):
+        return data['results']
@@ -0,0 +1,118 @@
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import OuterRef, Subquery, Sum
+from django.utils.module_loading import import_string
+
+from component.persian_text import tokenize
+from .models import AdSearchTerm
+
+MAX_QUERY_TERMS = 8
+
+# Searchable ad text and how much a match on it counts towards the rank
+FIELD_WEIGHTS = {
+    'title': 3,
+    'name': 2,
+    'username': 2,
+    'province': 1,
+    'city': 1,
+}
+
+
+def ad_search_terms(**fields):
+    """
+    Map each normalised token of the given fields to its weight.
+    A token found in several fields keeps its highest weight.
+    """
+    terms = {}
+    max_length = AdSearchTerm._meta.get_field('term').max_length
+    for field, weight in FIELD_WEIGHTS.items():
+        for token in tokenize(fields.get(field)):
+            token = token[:max_length]
+            terms[token] = max(terms.get(token, 0), weight)
+    return terms
+
+
+class LikeSearchBackend:
+    """Unindexed fallback: every term must appear (icontains) in one of the searchable fields."""
+
+    def search(self, queryset, value):
+        combined_query = models.Q()
+        for term in value.split()[:MAX_QUERY_TERMS]:
+            combined_query &= (
+                models.Q(title__icontains=term) |
+                models.Q(user__username__icontains=term) |
+                models.Q(name__icontains=term) |
+                models.Q(province__icontains=term) |
+                models.Q(city__icontains=term)
+            )
+        return queryset.filter(combined_query)
+
+    def index_ad(self, ad):
+        pass
+
+    def rebuild(self, queryset):
+        return 0
+
+
+class InvertedIndexSearchBackend:
+    """
+    Search through the ``ad_search_term`` table, which holds the normalised tokens
+    of every ad and is kept in sync on ad and user saves.
+    Each query term is an indexed prefix lookup, so cost does not grow with the number of ads.
+    """
+
+    def search(self, queryset, value):
+        terms = tokenize(value)[:MAX_QUERY_TERMS]
+        if not terms:
+            return queryset
+
+        any_term = models.Q()
+        for term in terms:
+            any_term |= models.Q(term__startswith=term)
+            queryset = queryset.filter(
+                id__in=AdSearchTerm.objects.filter(term__startswith=term).values('ad_id')
+            )
+
+        rank = (
+            AdSearchTerm.objects
+            .filter(any_term, ad_id=OuterRef('pk'))
+            .values('ad_id')
+            .annotate(rank=Sum('weight'))
+            .values('rank')
+        )
+        return queryset.annotate(search_rank=Subquery(rank))
+
+    def terms_for_ad(self, ad):
+        return ad_search_terms(
+            title=ad.title,
+            name=ad.name,
+            username=ad.user.username,
+            province=ad.province,
+            city=ad.city,
+        )
+
+    def index_ad(self, ad):
+        terms = self.terms_for_ad(ad)
+        existing = dict(AdSearchTerm.objects.filter(ad_id=ad.pk).values_list('term', 'weight'))
+        if existing == terms:
+            return
+        with transaction.atomic():
+            AdSearchTerm.objects.filter(ad_id=ad.pk).delete()
+            AdSearchTerm.objects.bulk_create(
+                AdSearchTerm(ad_id=ad.pk, term=term, weight=weight) for term, weight in terms.items()
+            )
+
+    def rebuild(self, queryset):
+        count = 0
+        for ad in queryset.select_related('user').iterator(chunk_size=500):
+            self.index_ad(ad)
+            count += 1
+        return count
+
+
+@lru_cache(maxsize=None)
+def get_search_backend():
+    backend_path = getattr(settings, 'AD_SEARCH_BACKEND', 'register_ad.search.InvertedIndexSearchBackend')
+    return import_string(backend_path)()
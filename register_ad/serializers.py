@@ -1,24 +1,51 @@
 # my_profile/serializers.py
-import jdatetime
+import os
+
+from django.core.files.base import ContentFile
 from django.utils import timezone
+from PIL import UnidentifiedImageError
 from rest_framework import serializers
 from .filters import COOPERATION_KIND
-from .models import register_ad, RegisterAdImage, Register_Request
+from .models import AdListing, register_ad, RegisterAdImage, Register_Request
 from my_profile.models import Profile
 from django.conf import settings
 from component.gender import GENDER_CHOICES
 from component.provinces import PROVINCES
 from component.skill import SKILL
+from utils.images import compress_images
+from utils.renditions import srcset
 import logging
 
 logger = logging.getLogger(__name__)
 
 User = settings.AUTH_USER_MODEL
 
+def profile_gender(obj):
+    # Listing querysets annotate ``profile_gender``; fall back to a lookup otherwise.
+    if hasattr(obj, 'profile_gender'):
+        gender = obj.profile_gender
+    else:
+        gender = Profile.objects.filter(user_id=obj.user_id).values_list('gender', flat=True).first()
+    if gender is None:
+        logger.warning(f"No profile found for user {obj.user_id}")
+    return gender
+
+
 class RegisterAdImageSerializer(serializers.ModelSerializer):
+    srcset = serializers.SerializerMethodField()
+
     class Meta:
         model = RegisterAdImage
-        fields = ['image']
+        fields = ['image', 'srcset']
+
+    def get_srcset(self, obj):
+        return srcset(obj.image, self.context.get('request'))
+
+
+def listing_images(listing, context):
+    # Unsaved instances render exactly as the images of an ad do
+    images = [RegisterAdImage(image=name) for name in listing.images]
+    return RegisterAdImageSerializer(images, many=True, context=context).data
 
 
 class ProfileSerializer(serializers.ModelSerializer):
@@ -83,7 +110,7 @@ class RegisterRequestSerializer(serializers.ModelSerializer):
 class RegisterAdListSerializer(serializers.ModelSerializer):
     images = RegisterAdImageSerializer(many=True, read_only=True)
     gender = serializers.SerializerMethodField()
-    user_id = serializers.IntegerField(source='user.id', read_only=True)
+    user_id = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = register_ad
@@ -94,19 +121,10 @@ class RegisterAdListSerializer(serializers.ModelSerializer):
         ]
 
     def get_gender(self, obj):
-        try:
-            profile = obj.user.worker_profile.get()
-            return profile.gender
-        except Profile.DoesNotExist:
-            logger.warning(f"No profile found for user {obj.user.id}")
-            return None
-
-    def get_created_at(self, obj):
-        jalali_date = jdatetime.date.fromgregorian(date=obj.created_at)
-        return jalali_date.strftime('%Y/%m/%d')
+        return profile_gender(obj)
 
     def to_representation(self, instance):
-        logger.info(f"Serializing ad ID {instance.id}, user_id: {instance.user.id}")
+        logger.info(f"Serializing ad ID {instance.id}, user_id: {instance.user_id}")
         return super().to_representation(instance)
 
 class AdDetailSerializer(serializers.ModelSerializer):
@@ -122,16 +140,7 @@ class AdDetailSerializer(serializers.ModelSerializer):
         ]
 
     def get_gender(self, obj):
-        try:
-            profile = obj.user.worker_profile.get()
-            return profile.gender
-        except Profile.DoesNotExist:
-            logger.warning(f"No profile found for user {obj.user.id}")
-            return None
-
-    def get_created_at(self, obj):
-        jalali_date = jdatetime.date.fromgregorian(date=obj.created_at)
-        return jalali_date.strftime('%Y/%m/%d')
+        return profile_gender(obj)
 
 class RegisterSerializer(serializers.ModelSerializer):
     images = RegisterAdImageSerializer(many=True, required=False, read_only=False)
@@ -213,6 +222,16 @@ class RegisterSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("فقط ۱ آگهی برای کارفرما یا کارگر مجاز است.")
 
         images_data = validated_data.pop('images', None)
+        images = request.FILES.getlist('images') if request.FILES else []
+        if len(images) > 5:
+            raise serializers.ValidationError("حداکثر 5 تصویر مجاز است.")
+        # Decode, downscale and re-encode the whole batch in parallel worker processes
+        try:
+            compressed = compress_images(images, formats=('jpg',), max_dimension=settings.IMAGE_MAX_DIMENSION)
+        except (UnidentifiedImageError, OSError) as e:
+            logger.error(f"Invalid ad image for user {user.id}: {e}")
+            raise serializers.ValidationError("فایل تصویر نامعتبر است.")
+
         profile = Profile.objects.get(user=user)
         register_instance = register_ad.objects.create(
             user=user,
@@ -222,11 +241,9 @@ class RegisterSerializer(serializers.ModelSerializer):
             **validated_data
         )
 
-        images = request.FILES.getlist('images') if request.FILES else []
-        if len(images) > 5:
-            raise serializers.ValidationError("حداکثر 5 تصویر مجاز است.")
-        for image in images:
-            RegisterAdImage.objects.create(register_ad=register_instance, image=image)
+        for image, renditions in zip(images, compressed):
+            name = f"{os.path.splitext(image.name)[0]}.jpg"
+            RegisterAdImage.objects.create(register_ad=register_instance, image=ContentFile(renditions['jpg'], name=name))
 
         logger.info(f"Ad created for user {user.id}, gender: {register_instance.gender}")
         return register_instance
@@ -236,7 +253,7 @@ class RegisterSerializer(serializers.ModelSerializer):
 class ActiveAdListSerializer(serializers.ModelSerializer):
     images = RegisterAdImageSerializer(many=True, read_only=True)
     user_name = serializers.CharField(source='user.username', read_only=True)
-    user_id = serializers.IntegerField(source='user.id', read_only=True)
+    user_id = serializers.IntegerField(read_only=True)
     created_at = serializers.SerializerMethodField()
 
     class Meta:
@@ -248,5 +265,32 @@ class ActiveAdListSerializer(serializers.ModelSerializer):
         ]
 
     def get_created_at(self, obj):
-        jalali_date = jdatetime.date.fromgregorian(date=obj.created_at)
-        return jalali_date.strftime('%Y/%m/%d')
+        return obj.created_at_jalali
+
+
+class RegisterAdListingSerializer(serializers.ModelSerializer):
+    """RegisterAdListSerializer output, read from the ad_listing row alone."""
+    images = serializers.SerializerMethodField()
+    gender = serializers.CharField(source='profile_gender', read_only=True)
+    user_id = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = AdListing
+        fields = RegisterAdListSerializer.Meta.fields
+
+    def get_images(self, obj):
+        return listing_images(obj, self.context)
+
+
+class ActiveAdListingSerializer(serializers.ModelSerializer):
+    """ActiveAdListSerializer output, read from the ad_listing row alone."""
+    images = serializers.SerializerMethodField()
+    user_id = serializers.IntegerField(read_only=True)
+    created_at = serializers.CharField(source='created_at_jalali', read_only=True)
+
+    class Meta:
+        model = AdListing
+        fields = ActiveAdListSerializer.Meta.fields
+
+    def get_images(self, obj):
+        return listing_images(obj, self.context)
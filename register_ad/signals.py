@@ -0,0 +1,76 @@
+from django.conf import settings
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from my_profile.models import Profile
+from .listing import refresh_listings, refresh_user_listings
+from .models import RegisterAdImage, register_ad
+from .search import get_search_backend
+
+# Owner and profile columns copied into ad_listing rows
+LISTED_USER_FIELDS = {'username', 'selected_professional'}
+LISTED_PROFILE_FIELDS = {'gender', 'user'}
+
+
+def touches(update_fields, fields):
+    return update_fields is None or bool(fields & set(update_fields))
+
+
+@receiver(post_save, sender=register_ad)
+def index_ad_for_search(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    get_search_backend().index_ad(instance)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def reindex_user_ads_for_search(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    # The username is part of the search text of every ad the user owns
+    if created or raw or not touches(update_fields, {'username'}):
+        return
+    backend = get_search_backend()
+    for ad in register_ad.objects.filter(user=instance):
+        ad.user = instance
+        backend.index_ad(ad)
+
+
+@receiver(post_save, sender=register_ad)
+def refresh_ad_listing(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    refresh_listings([instance.pk])
+
+
+@receiver(post_save, sender=RegisterAdImage)
+def refresh_listing_images(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    refresh_listings([instance.register_ad_id])
+
+
+@receiver(post_delete, sender=RegisterAdImage)
+def refresh_listing_deleted_image(sender, instance, origin=None, **kwargs):
+    # Only direct image deletes: when an ad or user delete cascades here the
+    # listing row is deleted along with the ad
+    if isinstance(origin, QuerySet):
+        origin = origin.model
+    elif origin is not None:
+        origin = type(origin)
+    if origin is not RegisterAdImage:
+        return
+    refresh_listings([instance.register_ad_id])
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def refresh_user_ad_listings(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if created or raw or not touches(update_fields, LISTED_USER_FIELDS):
+        return
+    refresh_user_listings(instance.pk)
+
+
+@receiver(post_save, sender=Profile)
+def refresh_profile_ad_listings(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or not touches(update_fields, LISTED_PROFILE_FIELDS):
+        return
+    refresh_user_listings(instance.user_id)
@@ -1,3 +1,214 @@
+import datetime
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
 from django.test import TestCase
+from rest_framework.test import APITestCase
+
+from component.jalali import jalali_date
+from core.authentication import get_token_version, tokens_for_user
+from core.models import CustomUser
+from my_profile.models import Profile
+from .deletion import delete_ads
+from .models import AdListing, AdSearchTerm, RegisterAdImage, register_ad
+
+
+def create_ad(index, **fields):
+    user = CustomUser.objects.create(
+        phone_number=f'0912{index:07d}', username=f'user{index}', selected_professional='Worker', is_verified=True
+    )
+    Profile.objects.create(user=user, name=f'کاربر {index}', city='تهران', gender='مرد', description='d')
+    ad = register_ad.objects.create(**{
+        'user': user, 'name': f'کاربر {index}', 'selected_professional': 'Worker', 'title': f'آگهی {index}',
+        'description': 'd', 'gender': 'مرد', 'fee': 'توافقی', 'phone_number': user.phone_number,
+        'province': 'تهران', 'city': 'تهران', 'skill': 'نقاش', **fields
+    })
+    for image in range(2):
+        RegisterAdImage.objects.create(register_ad=ad, image=f'images/register-ad/{index}-{image}.jpg')
+    return ad
+
+
+class AdEndpointQueryCountTests(APITestCase):
+    """Each ad endpoint runs a fixed number of queries, however many ads, images and owners there are."""
+
+    def setUp(self):
+        cache.clear()
+        self.viewer = CustomUser.objects.create(phone_number='09990000000', selected_professional='Worker')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {tokens_for_user(self.viewer).access_token}')
+        get_token_version(self.viewer.pk)  # warm the revocation check, which is cached between requests
+        self.ads = [create_ad(index) for index in range(3)]
+
+    def assertConstantQueries(self, url, expected):
+        with self.assertNumQueries(expected):
+            self.assertEqual(self.client.get(url).status_code, 200)
+        for index in range(3, 8):
+            create_ad(index)
+        with self.assertNumQueries(expected):
+            self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_register_list(self):
+        # count + listing page
+        self.assertConstantQueries('/register-ad/register/', 2)
+
+    def test_register_retrieve(self):
+        # ad with owner and profile gender + images
+        self.assertConstantQueries(f'/register-ad/register/{self.ads[0].pk}/', 2)
+
+    def test_active_ads(self):
+        self.assertConstantQueries('/register-ad/active-ads/', 2)
+
+    def test_active_ads_keyset_page(self):
+        self.assertConstantQueries('/register-ad/active-ads/?cursor=&page_size=2', 1)
+
+    def test_ad_details(self):
+        self.assertConstantQueries(f'/register-ad/ad-details/{self.ads[0].pk}/', 2)
+
+
+class ExplainAdFiltersTests(TestCase):
+    """The common filter combinations must be served by an index, not a full scan of the ad table."""
+
+    def test_common_filters_use_indexes(self):
+        for index in range(20):
+            create_ad(index)
+        out = StringIO()
+        call_command('explain_ad_filters', stdout=out)
+        self.assertNotIn('FULL SCAN', out.getvalue())
+
+
+class AdListingImageTests(TestCase):
+    """ad_listing rows follow image deletes, whichever path deletes them."""
+
+    def setUp(self):
+        self.ad = create_ad(0)
+
+    def listed_images(self):
+        return AdListing.objects.get(pk=self.ad.pk).images
+
+    def test_image_delete_refreshes_listing(self):
+        image, remaining = self.ad.images.order_by('pk')
+        image.delete()
+        self.assertEqual(self.listed_images(), [remaining.image.name])
+
+    def test_image_queryset_delete_refreshes_listing(self):
+        RegisterAdImage.objects.filter(register_ad=self.ad).delete()
+        self.assertEqual(self.listed_images(), [])
+
+    def test_ad_delete_removes_listing(self):
+        self.assertEqual(delete_ads(register_ad.objects.filter(pk=self.ad.pk)), (1, 2))
+        self.assertFalse(AdListing.objects.filter(pk=self.ad.pk).exists())
+
+    def test_user_delete_removes_listing(self):
+        self.ad.user.delete()
+        self.assertFalse(AdListing.objects.exists())
+
+
+class UserSearchReindexTests(TestCase):
+    """Saving a user re-indexes their ads only when the username can have changed."""
+
+    def setUp(self):
+        self.ad = create_ad(0)
+        self.user = self.ad.user
+
+    def test_last_login_save_skips_reindex(self):
+        with self.assertNumQueries(1):
+            self.user.save(update_fields=['last_login'])
+
+    def test_username_change_reindexes(self):
+        self.user.username = 'renamed'
+        self.user.save(update_fields=['username'])
+        self.assertTrue(AdSearchTerm.objects.filter(ad=self.ad, term='renamed').exists())
+
+
+class AdPaginationTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.viewer = CustomUser.objects.create(phone_number='09990000000', selected_professional='Worker')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {tokens_for_user(self.viewer).access_token}')
+        self.painter = create_ad(0, title='نقاش')
+        self.other = create_ad(1, name='نقاش')  # newer, but matches on a lower-weight field
+
+    def test_cursor_pages_by_created_at(self):
+        response = self.client.get('/register-ad/active-ads/?cursor=&page_size=1')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('count', response.json())
+        self.assertEqual([ad['id'] for ad in response.json()['results']], [self.other.pk])
+
+    def test_cursor_with_search_keeps_rank_order(self):
+        response = self.client.get('/register-ad/active-ads/?cursor=&user_name=نقاش')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('count', response.json())
+        self.assertEqual([ad['id'] for ad in response.json()['results']], [self.painter.pk, self.other.pk])
+
+
+class BenchmarkAdPaginationTests(TestCase):
+    def test_seeds_each_size_and_cleans_up(self):
+        create_ad(0)
+        out = StringIO()
+        call_command('benchmark_ad_pagination', sizes='20,45', batch_size=10, repeat=1, stdout=out)
+        self.assertIn('active ads: 20', out.getvalue())
+        self.assertIn('active ads: 45', out.getvalue())
+        self.assertEqual(AdListing.objects.count(), 1)
+        self.assertEqual(register_ad.objects.count(), 1)
+
+
+class BulkDeleteTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.staff = CustomUser.objects.create(phone_number='09990000000', selected_professional='Worker', is_staff=True)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {tokens_for_user(self.staff).access_token}')
+        self.ad = create_ad(0)
+
+    def bulk_delete(self, **data):
+        return self.client.post('/register-ad/register/bulk-delete/', data, format='json')
+
+    def test_older_than_days_must_be_positive(self):
+        for days in (-1, 0, '-30', 'abc'):
+            with self.subTest(days=days):
+                self.assertEqual(self.bulk_delete(older_than_days=days).status_code, 400)
+        self.assertTrue(register_ad.objects.filter(pk=self.ad.pk).exists())
+
+    def test_older_than_days_keeps_recent_ads(self):
+        response = self.bulk_delete(older_than_days=1)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['deleted'], 0)
+
+    def test_delete_by_ids(self):
+        response = self.bulk_delete(ids=[self.ad.pk])
+        self.assertEqual(response.json(), {'deleted': 1, 'files': 2})
+        self.assertFalse(AdListing.objects.exists())
+
+
+class CreatedAtJalaliTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.viewer = CustomUser.objects.create(phone_number='09990000000', selected_professional='Worker')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {tokens_for_user(self.viewer).access_token}')
+
+    def test_listing_copies_the_stored_column(self):
+        ad = create_ad(0)
+        self.assertEqual(AdListing.objects.get(pk=ad.pk).created_at_jalali, ad.created_at_jalali)
+
+    def test_insert_across_midnight_updates_listing(self):
+        yesterday = datetime.date.today() - datetime.timedelta(days=1)
+        owner = create_ad(0).user
+        with mock.patch('register_ad.models.datetime') as fake_datetime:
+            fake_datetime.date.today.return_value = yesterday
+            ad = register_ad.objects.create(
+                user=owner, name='کاربر', selected_professional='Worker', title='آگهی', description='d',
+                gender='مرد', fee='توافقی', phone_number=owner.phone_number, province='تهران', city='تهران',
+            )
+        expected = jalali_date(datetime.date.today())
+        self.assertEqual(register_ad.objects.get(pk=ad.pk).created_at_jalali, expected)
+        self.assertEqual(AdListing.objects.get(pk=ad.pk).created_at_jalali, expected)
 
-# Create your tests here.
+    def test_active_ads_render_jalali_and_others_iso(self):
+        ad = create_ad(0)
+        active = self.client.get('/register-ad/active-ads/').json()['results'][0]
+        self.assertEqual(active['created_at'], ad.created_at_jalali)
+        for url in ('/register-ad/register/', f'/register-ad/ad-details/{ad.pk}/'):
+            with self.subTest(url=url):
+                data = self.client.get(url).json()
+                data = data['results'][0] if 'results' in data else data
+                self.assertEqual(data['created_at'], ad.created_at.isoformat())
@@ -1,5 +1,3 @@
-from django.conf import settings
-from django.conf.urls.static import static
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from register_ad import views
@@ -19,4 +17,4 @@ urlpatterns = [
     path('skills/', views.get_skills, name='get_skills'),
     path('gender/', views.get_gender_choices, name='get_gender_choices'),
     path('active-ads/', views.ActiveAdListView.as_view(), name='active-ads'),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT, show_indexes=True)
\ No newline at end of file
+]
@@ -1,24 +1,33 @@
 # register_ad/views.py
+from datetime import timedelta
+
 from django.contrib.auth import get_user_model
+from django.utils import timezone
+from django.db.models import OuterRef, Subquery
 from rest_framework.exceptions import ValidationError
 from core.models import CustomUser
 from utils.sms import logger
+from utils.query_stats import log_queryset_stats
+from utils.renderers import FAST_RENDERER_CLASSES
 from .permissions import IsOwner
-from rest_framework.decorators import api_view
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.decorators import action, api_view
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
-from rest_framework_simplejwt.authentication import JWTAuthentication
-from rest_framework.pagination import PageNumberPagination
+from core.authentication import StatelessJWTAuthentication
 from django_filters.rest_framework import DjangoFilterBackend
 from core.serializers import UserSerializer
-from .filters import RegisterAdFilter
-from component.gender import GENDER_CHOICES
-from component.provinces import PROVINCES
-from component.skill import SKILL
-from .models import register_ad, Register_Request
+from .filters import AdListingFilter, RegisterAdFilter
+from .pagination import AdListPagination
+from reference.data import reference_response
+from .models import AdListing, register_ad, Register_Request
+from my_profile.models import Profile
 from rest_framework import viewsets, generics, status
-from .serializers import RegisterSerializer, RegisterAdListSerializer, ActiveAdListSerializer, AdDetailSerializer, RegisterRequestSerializer
-from rest_framework.parsers import MultiPartParser, FormParser
+from .serializers import (
+    RegisterSerializer, RegisterAdListSerializer, RegisterAdListingSerializer, ActiveAdListingSerializer,
+    AdDetailSerializer, RegisterRequestSerializer,
+)
+from rest_framework.parsers import JSONParser, MultiPartParser, FormParser
+from .deletion import delete_ads
 
 User = get_user_model()
 
@@ -29,19 +38,26 @@ def get_current_user(request):
 
 @api_view(['GET'])
 def get_provinces(request):
-    return Response(PROVINCES)
+    return reference_response(request, 'provinces')
 
 @api_view(['GET'])
 def get_skills(request):
-    return Response(SKILL)
+    return reference_response(request, 'skills')
 
 @api_view(['GET'])
 def get_gender_choices(request):
-    return Response(GENDER_CHOICES)
+    return reference_response(request, 'gender')
 
-class StandardResultsSetPagination(PageNumberPagination):
-    page_size = 1000  # Default to 10
-    page_size_query_param = 'page_size'
+def ad_listing_queryset():
+    # Carry the owner and the owner's profile gender in the listing query so the
+    # serializers do not issue one query per ad.
+    profile_gender = Profile.objects.filter(user_id=OuterRef('user_id')).values('gender')[:1]
+    return (
+        register_ad.objects
+        .select_related('user')
+        .prefetch_related('images')
+        .annotate(profile_gender=Subquery(profile_gender))
+    )
 
 
 class RegisterRequestViewSet(viewsets.ModelViewSet):
@@ -104,26 +120,33 @@ class ReportRegisterRequestViewSet(viewsets.ModelViewSet):
 
 class RegisterAdView(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [StatelessJWTAuthentication]
     filter_backends = [DjangoFilterBackend]
-    filterset_class = RegisterAdFilter
     parser_classes = [MultiPartParser, FormParser]
+    renderer_classes = FAST_RENDERER_CLASSES
     http_method_names = ['get', 'post', 'patch', 'delete']
-    pagination_class = StandardResultsSetPagination
+    pagination_class = AdListPagination
 
     def get_queryset(self):
         if self.action == 'retrieve':
             logger.info(f"Retrieve ad ID {self.kwargs.get('pk')} for user {self.request.user.id}")
-            queryset = register_ad.objects.prefetch_related('images').all()
-            logger.info(f"Retrieve queryset: {queryset.count()} ads, IDs: {[ad.id for ad in queryset]}")
+            queryset = ad_listing_queryset()
+            log_queryset_stats(logger, "Retrieve queryset", queryset, with_ids=True)
             return queryset
         elif self.action == 'list':
             logger.info(f"List ads for user {self.request.user.id}")
-            return register_ad.objects.prefetch_related('images').all()
+            return AdListing.objects.all()
         logger.info(f"Restricted action {self.action} for user {self.request.user.id}")
         return register_ad.objects.prefetch_related('images').filter(user=self.request.user)
 
+    @property
+    def filterset_class(self):
+        # Listing pages come from the ad_listing read model, single ads from the ad table
+        return AdListingFilter if self.action == 'list' else RegisterAdFilter
+
     def get_permissions(self):
+        if self.action == 'bulk_delete':
+            return [IsAuthenticated(), IsAdminUser()]
         if self.action in ['create', 'update', 'partial_update', 'destroy']:
             logger.info(f"Applying IsOwner for action {self.action}")
             return [IsAuthenticated(), IsOwner()]
@@ -131,6 +154,8 @@ class RegisterAdView(viewsets.ModelViewSet):
         return [IsAuthenticated()]
 
     def get_serializer_class(self):
+        if self.action == 'list':
+            return RegisterAdListingSerializer
         if self.request.method == 'GET':
             return RegisterAdListSerializer
         return RegisterSerializer
@@ -158,19 +183,9 @@ class RegisterAdView(viewsets.ModelViewSet):
         logger.info(f"Attempting to delete ad ID {self.kwargs.get('pk')} for user {request.user.id}")
         try:
             instance = self.get_object()
-            # Log ad details before deletion
-            logger.info(
-                f"Deleting ad ID {instance.id}: title={instance.title}, user_id={instance.user_id}, images_count={instance.images.count()}")
-
-            # Explicitly delete image files from storage
-            for image in instance.images.all():
-                if image.image:
-                    logger.info(f"Deleting image file: {image.image.name}")
-                    image.image.delete(save=False)  # Delete file from storage
-                image.delete()  # Delete image record from database
-
-            # Delete the ad (database CASCADE should handle related records, but images are already deleted above)
-            self.perform_destroy(instance)
+            logger.info(f"Deleting ad ID {instance.id}: title={instance.title}, user_id={instance.user_id}")
+            # Rows go in one transaction; image files are released after commit
+            delete_ads(register_ad.objects.filter(pk=instance.pk))
             logger.info(f"Ad ID {instance.id} and associated images deleted successfully")
             return Response(status=204)
         except register_ad.DoesNotExist:
@@ -180,6 +195,35 @@ class RegisterAdView(viewsets.ModelViewSet):
             logger.error(f"Error deleting ad ID {self.kwargs.get('pk')}: {str(e)}")
             return Response({"detail": f"خطای سرور: {str(e)}"}, status=500)
 
+    @action(detail=False, methods=['post'], url_path='bulk-delete',
+            parser_classes=[JSONParser, MultiPartParser, FormParser])
+    def bulk_delete(self, request):
+        """Staff only: delete ads by `ids` and/or expire every ad older than `older_than_days`."""
+        ids = request.data.getlist('ids') if hasattr(request.data, 'getlist') else request.data.get('ids')
+        if isinstance(ids, (str, int)):
+            ids = [ids]
+        older_than_days = request.data.get('older_than_days')
+        if not ids and older_than_days in (None, ''):
+            return Response({"detail": "ids یا older_than_days الزامی است."}, status=400)
+
+        queryset = register_ad.objects.all()
+        try:
+            if ids:
+                queryset = queryset.filter(pk__in=[int(ad_id) for ad_id in ids])
+            if older_than_days not in (None, ''):
+                older_than_days = int(older_than_days)
+        except (TypeError, ValueError):
+            return Response({"detail": "مقادیر ارسالی نامعتبر است."}, status=400)
+        if older_than_days not in (None, ''):
+            # Zero or negative days would put the cutoff today or in the future and match every ad
+            if older_than_days < 1:
+                return Response({"older_than_days": "older_than_days باید عدد صحیح بزرگ‌تر از صفر باشد."}, status=400)
+            queryset = queryset.filter(created_at__lt=timezone.localdate() - timedelta(days=older_than_days))
+
+        deleted, files = delete_ads(queryset)
+        logger.info(f"Bulk delete by user {request.user.id}: {deleted} ads, {files} files")
+        return Response({"deleted": deleted, "files": files})
+
     def retrieve(self, request, *args, **kwargs):
         logger.info(f"Attempting to retrieve ad ID {kwargs.get('pk')}")
         try:
@@ -198,22 +242,23 @@ class RegisterAdView(viewsets.ModelViewSet):
 
 class ActiveAdListView(generics.ListAPIView):
     permission_classes = [IsAuthenticated]
-    authentication_classes = [JWTAuthentication]
-    serializer_class = ActiveAdListSerializer
+    authentication_classes = [StatelessJWTAuthentication]
+    serializer_class = ActiveAdListingSerializer
+    renderer_classes = FAST_RENDERER_CLASSES
     filter_backends = [DjangoFilterBackend]
-    filterset_class = RegisterAdFilter
-    pagination_class = StandardResultsSetPagination
+    filterset_class = AdListingFilter
+    pagination_class = AdListPagination
 
     def get_queryset(self):
-        queryset = register_ad.objects.prefetch_related('images').filter(status='active')
-        logger.info(f"Active ads queryset: {queryset.count()} ads, IDs: {[ad.id for ad in queryset]}")
+        queryset = AdListing.objects.filter(status='active')
+        log_queryset_stats(logger, "Active ads queryset", queryset, with_ids=True)
         return queryset
 
 class AdDetailView(generics.RetrieveAPIView):
     permission_classes = [IsAuthenticated]
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [StatelessJWTAuthentication]
     serializer_class = AdDetailSerializer
-    queryset = register_ad.objects.prefetch_related('images').all()
+    queryset = ad_listing_queryset()
     lookup_field = 'pk'
 
     def retrieve(self, request, *args, **kwargs):
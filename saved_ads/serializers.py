@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from .models import SavedAd, register_ad
+from utils.renditions import srcset
 
 class SavedAdSerializer(serializers.ModelSerializer):
     id = serializers.IntegerField(read_only=True)
@@ -14,4 +15,5 @@ class SavedAdSerializer(serializers.ModelSerializer):
 
     def get_images(self, obj):
         # Assuming RegisterAd has a related images field
-        return [{'image': img.image.url} for img in obj.ad.images.all()]
+        request = self.context.get('request')
+        return [{'image': img.image.url, 'srcset': srcset(img.image, request)} for img in obj.ad.images.all()]
@@ -4,10 +4,14 @@ from rest_framework.permissions import IsAuthenticated
 from .models import SavedAd
 from .serializers import SavedAdSerializer
 from django.db import IntegrityError
+from utils.renderers import FAST_RENDERER_CLASSES
+
+
 class SavedAdViewSet(viewsets.ModelViewSet):
     queryset = SavedAd.objects.all()
     serializer_class = SavedAdSerializer
     permission_classes = [IsAuthenticated]
+    renderer_classes = FAST_RENDERER_CLASSES
 
     def get_queryset(self):
         return SavedAd.objects.filter(user=self.request.user).select_related('ad')
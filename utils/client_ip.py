@@ -0,0 +1,15 @@
+from django.conf import settings
+
+
+def client_ip(request):
+    """
+    Address of the client for per-IP limits. Behind the front server REMOTE_ADDR is
+    the proxy itself, so the address is read from CLIENT_IP_HEADER: the entry added by
+    the outermost of TRUSTED_PROXY_COUNT proxies (the last one for a single proxy).
+    """
+    header = settings.CLIENT_IP_HEADER
+    if header:
+        addresses = [address.strip() for address in request.headers.get(header, '').split(',') if address.strip()]
+        if len(addresses) >= settings.TRUSTED_PROXY_COUNT:
+            return addresses[-settings.TRUSTED_PROXY_COUNT]
+    return request.META.get('REMOTE_ADDR')
@@ -0,0 +1,74 @@
+import atexit
+import logging
+import threading
+
+from django.core.files.storage import default_storage
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+class FileSweeper:
+    """
+    Deletes storage files on a background thread, in batches, so requests that
+    drop many rows do not wait on one storage call per file. Anything still
+    queued at interpreter exit is swept before shutdown; files lost to a crash
+    are left for the `collect_orphaned_media` command.
+    """
+
+    def __init__(self, batch_size=500):
+        self.batch_size = batch_size
+        self.pending = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def schedule(self, names):
+        names = [name for name in names if name]
+        if not names:
+            return
+        with self._lock:
+            self.pending.extend(names)
+            if self._thread is None:
+                self._start()
+        self._wakeup.set()
+
+    def _start(self):
+        self._thread = threading.Thread(target=self._run, name='file-sweeper', daemon=True)
+        self._thread.start()
+        atexit.register(self.sweep)
+
+    def _run(self):
+        while True:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.error(f"File sweep failed: {e}")
+            finally:
+                connections.close_all()
+
+    def sweep(self):
+        """Delete everything queued so far; returns the number of files handled."""
+        swept = 0
+        while True:
+            with self._lock:
+                batch, self.pending = self.pending[:self.batch_size], self.pending[self.batch_size:]
+            if not batch:
+                return swept
+            try:
+                if hasattr(default_storage, 'delete_many'):
+                    default_storage.delete_many(batch)
+                else:
+                    for name in batch:
+                        default_storage.delete(name)
+            except Exception:
+                # Put the batch back so the next sweep retries it
+                with self._lock:
+                    self.pending[:0] = batch
+                raise
+            swept += len(batch)
+
+
+file_sweeper = FileSweeper()
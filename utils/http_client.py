@@ -0,0 +1,87 @@
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class LatencyHistogram:
+    """Thread-safe request latency histogram with fixed millisecond buckets."""
+    BUCKETS_MS = (25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = [0] * (len(self.BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.errors = 0
+
+    def observe(self, elapsed_ms, error=False):
+        index = next((i for i, bound in enumerate(self.BUCKETS_MS) if elapsed_ms <= bound), len(self.BUCKETS_MS))
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total_ms += elapsed_ms
+            self.errors += error
+
+    def snapshot(self):
+        with self._lock:
+            buckets = {f'<={bound}ms': count for bound, count in zip(self.BUCKETS_MS, self.counts)}
+            buckets['+Inf'] = self.counts[-1]
+            return {
+                'count': self.count,
+                'errors': self.errors,
+                'mean_ms': self.total_ms / self.count if self.count else 0.0,
+                'buckets': buckets,
+            }
+
+
+class ProviderClient:
+    """
+    HTTP client for one external provider: a persistent requests.Session with a
+    keep-alive connection pool, so repeated calls skip the TCP/TLS handshake.
+    """
+
+    def __init__(self, name, base_url, timeout=(3.05, 10), pool_size=10):
+        self.name = name
+        self.base_url = base_url
+        self.timeout = timeout
+        self.latency = LatencyHistogram()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=False)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def post(self, path, data=None, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        start = time.perf_counter()
+        error = True
+        try:
+            response = self.session.post(f'{self.base_url}{path}', data=data, **kwargs)
+            error = response.status_code >= 500
+            return response
+        finally:
+            self.latency.observe((time.perf_counter() - start) * 1000, error=error)
+
+    def close(self):
+        self.session.close()
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(name, base_url, **options):
+    """Process-wide ProviderClient for `name`; created on first use."""
+    client = _clients.get(name)
+    if client is None or client.base_url != base_url:
+        with _clients_lock:
+            client = _clients.get(name)
+            if client is None or client.base_url != base_url:
+                client = ProviderClient(name, base_url, **options)
+                _clients[name] = client
+    return client
+
+
+def latency_snapshots():
+    return {name: client.latency.snapshot() for name, client in _clients.items()}
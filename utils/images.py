@@ -0,0 +1,89 @@
+import io
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from PIL import Image, ImageOps
+
+# Same settings the upload views used before processing moved to the worker
+JPEG_QUALITY = 75
+WEBP_QUALITY = 75
+# extension -> (PIL format, save options)
+ENCODERS = {
+    'jpg': ('JPEG', {'quality': JPEG_QUALITY, 'optimize': True}),
+    'webp': ('WEBP', {'quality': WEBP_QUALITY, 'method': 4}),
+}
+
+
+def compress_image(source, formats=('jpg', 'webp'), max_dimension=None):
+    """Decode an uploaded image once and return its compressed renditions, e.g. {'jpg': bytes, 'webp': bytes}."""
+    img = Image.open(source)
+    if max_dimension:
+        # JPEGs are decoded directly at 1/2, 1/4 or 1/8 scale, so a 12MP photo
+        # never needs its full-size bitmap in memory
+        img.draft('RGB', (max_dimension, max_dimension))
+    img = ImageOps.exif_transpose(img)
+    if img.mode not in ('RGB', 'L'):
+        img = img.convert('RGB')
+    if max_dimension:
+        img.thumbnail((max_dimension, max_dimension))
+
+    renditions = {}
+    for extension in formats:
+        image_format, options = ENCODERS[extension]
+        output = io.BytesIO()
+        img.save(output, format=image_format, **options)
+        renditions[extension] = output.getvalue()
+    return renditions
+
+
+def _compress_bytes(data, formats, max_dimension):
+    return compress_image(io.BytesIO(data), formats, max_dimension)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_process_pool():
+    """Process-wide pool for CPU-bound image work, or None when IMAGE_PROCESS_WORKERS < 2."""
+    global _pool
+    if settings.IMAGE_PROCESS_WORKERS < 2:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            # Workers are replaced after a number of images so fragmented PIL buffers do not accumulate
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.IMAGE_PROCESS_WORKERS,
+                max_tasks_per_child=settings.IMAGE_PROCESS_TASKS_PER_CHILD,
+            )
+        return _pool
+
+
+def _reset_pool():
+    global _pool
+    with _pool_lock:
+        _pool = None
+
+
+def submit_compress(data, formats=('jpg', 'webp'), max_dimension=None):
+    """Future for compress_image() on raw bytes, run in the process pool when one is configured."""
+    pool = get_process_pool()
+    if pool is not None:
+        try:
+            return pool.submit(_compress_bytes, data, formats, max_dimension)
+        except BrokenProcessPool:
+            _reset_pool()
+    future = Future()
+    try:
+        future.set_result(_compress_bytes(data, formats, max_dimension))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+
+def compress_images(sources, formats=('jpg', 'webp'), max_dimension=None):
+    """Compress a batch of files in parallel; results keep the input order."""
+    futures = [submit_compress(source.read(), formats, max_dimension) for source in sources]
+    return [future.result() for future in futures]
@@ -0,0 +1,54 @@
+from django.db.backends.mysql.base import DatabaseWrapper as MySQLDatabaseWrapper
+
+from .pool import ConnectionPool, get_pool
+
+POOL_DEFAULTS = {
+    'SIZE': 10,
+    'MAX_OVERFLOW': 10,
+    'TIMEOUT': 5,
+    'RECYCLE': 3600,
+}
+
+
+def reset_connection(conn):
+    # Autocommit connections have nothing to roll back; skip the round trip
+    if not conn.get_autocommit():
+        conn.rollback()
+
+
+class DatabaseWrapper(MySQLDatabaseWrapper):
+    """
+    MySQL backend whose connections come from a per-process pool. Django still
+    "closes" the connection at the end of every request (keep CONN_MAX_AGE at 0);
+    closing returns it to the pool instead of dropping the socket, so this works
+    the same under WSGI worker threads and Daphne's sync-view thread.
+    """
+
+    pool = None
+
+    def get_pool(self, conn_params):
+        def build():
+            options = {**POOL_DEFAULTS, **self.settings_dict.get('POOL', {})}
+            return ConnectionPool(
+                connect=lambda: MySQLDatabaseWrapper.get_new_connection(self, conn_params),
+                validate=lambda conn: conn.ping(),
+                reset=reset_connection,
+                size=options['SIZE'],
+                max_overflow=options['MAX_OVERFLOW'],
+                timeout=options['TIMEOUT'],
+                recycle=options['RECYCLE'],
+            )
+
+        return get_pool(self.alias, build)
+
+    def get_new_connection(self, conn_params):
+        self.pool = self.get_pool(conn_params)
+        return self.pool.checkout()
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                # A connection abandoned mid-transaction stays referenced by this
+                # wrapper (see BaseDatabaseWrapper.close), so it must not be reused.
+                discard = self.in_atomic_block or (self.errors_occurred and not self.is_usable())
+                self.pool.checkin(self.connection, discard=discard)
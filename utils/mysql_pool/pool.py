@@ -0,0 +1,174 @@
+import atexit
+import logging
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class PoolStats:
+    """Counters for one pool; read them with ConnectionPool.snapshot()."""
+
+    def __init__(self):
+        self.created = 0
+        self.checkouts = 0
+        self.waits = 0
+        self.wait_ms = 0.0
+        self.timeouts = 0
+        self.overflow = 0
+        self.peak_checked_out = 0
+        self.health_check_failures = 0
+        self.recycled = 0
+        self.discarded = 0
+
+
+class ConnectionPool:
+    """
+    Bounded, thread-safe pool of DB-API connections. `size` connections are kept
+    idle between requests; up to `max_overflow` extra ones may be opened under load
+    and are closed again when returned. Idle connections are pinged before reuse
+    and replaced after `recycle` seconds.
+    """
+
+    def __init__(self, connect, validate, reset, size=10, max_overflow=10, timeout=5, recycle=3600):
+        self._connect = connect
+        self._validate = validate
+        self._reset = reset
+        self.size = size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.recycle = recycle
+        self.stats = PoolStats()
+        self._idle = deque()
+        self._created_at = {}
+        self._checked_out = 0
+        self._cond = threading.Condition()
+
+    def checkout(self):
+        deadline = time.monotonic() + self.timeout
+        waited_since = None
+        with self._cond:
+            while not self._idle and self._checked_out >= self.size + self.max_overflow:
+                remaining = deadline - time.monotonic()
+                if waited_since is None:
+                    waited_since = time.monotonic()
+                    self.stats.waits += 1
+                if remaining <= 0:
+                    self.stats.timeouts += 1
+                    raise PoolTimeout(f"No database connection available within {self.timeout}s")
+                self._cond.wait(remaining)
+            if waited_since is not None:
+                self.stats.wait_ms += (time.monotonic() - waited_since) * 1000
+            self._checked_out += 1
+            self.stats.checkouts += 1
+            if self._checked_out > self.size:
+                self.stats.overflow += 1
+            self.stats.peak_checked_out = max(self.stats.peak_checked_out, self._checked_out)
+            conn = self._idle.pop() if self._idle else None
+
+        try:
+            while conn is not None and not self._healthy(conn):
+                with self._cond:
+                    conn = self._idle.pop() if self._idle else None
+            if conn is None:
+                conn = self._connect()
+                with self._cond:
+                    self._created_at[id(conn)] = time.monotonic()
+                    self.stats.created += 1
+            return conn
+        except Exception:
+            self._release_slot()
+            raise
+
+    def checkin(self, conn, discard=False):
+        if not discard:
+            try:
+                self._reset(conn)
+            except Exception as e:
+                logger.warning(f"Discarding pooled connection that failed to reset: {e}")
+                discard = True
+        with self._cond:
+            self._checked_out -= 1
+            keep = not discard and len(self._idle) < self.size
+            if keep:
+                self._idle.append(conn)
+            else:
+                self._created_at.pop(id(conn), None)
+            self._cond.notify()
+        if not keep:
+            self._close(conn)
+
+    def _healthy(self, conn):
+        if time.monotonic() - self._created_at.get(id(conn), 0) > self.recycle:
+            self.stats.recycled += 1
+        else:
+            try:
+                self._validate(conn)
+                return True
+            except Exception as e:
+                self.stats.health_check_failures += 1
+                logger.warning(f"Pooled connection failed its health check: {e}")
+        with self._cond:
+            self._created_at.pop(id(conn), None)
+        self._close(conn)
+        return False
+
+    def _release_slot(self):
+        with self._cond:
+            self._checked_out -= 1
+            self._cond.notify()
+
+    def _close(self, conn):
+        self.stats.discarded += 1
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def close_idle(self):
+        with self._cond:
+            idle, self._idle = list(self._idle), deque()
+            for conn in idle:
+                self._created_at.pop(id(conn), None)
+        for conn in idle:
+            self._close(conn)
+
+    def snapshot(self):
+        with self._cond:
+            return {
+                'size': self.size,
+                'max_overflow': self.max_overflow,
+                'idle': len(self._idle),
+                'checked_out': self._checked_out,
+                **vars(self.stats),
+            }
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias, factory):
+    """Process-wide pool for a database alias; `factory` builds it on first use."""
+    pool = _pools.get(alias)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(alias)
+            if pool is None:
+                pool = _pools[alias] = factory()
+    return pool
+
+
+def pool_snapshots():
+    return {alias: pool.snapshot() for alias, pool in _pools.items()}
+
+
+@atexit.register
+def close_pools():
+    for pool in list(_pools.values()):
+        pool.close_idle()
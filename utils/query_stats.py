@@ -0,0 +1,25 @@
+import logging
+import random
+
+from django.conf import settings
+
+
+def should_record_queryset_stats():
+    """
+    Queryset counts are only worth their extra table scans in debug builds or
+    for a sampled fraction of production requests.
+    """
+    if settings.DEBUG:
+        return True
+    sample_rate = getattr(settings, 'QUERYSET_STATS_SAMPLE_RATE', 0.0)
+    return sample_rate > 0 and random.random() < sample_rate
+
+
+def log_queryset_stats(logger, label, queryset, with_ids=False, level=logging.INFO):
+    if not logger.isEnabledFor(level) or not should_record_queryset_stats():
+        return
+    if with_ids:
+        ids = list(queryset.values_list('id', flat=True))
+        logger.log(level, f"{label}: {len(ids)} ads, IDs: {ids}")
+    else:
+        logger.log(level, f"{label}: {queryset.count()} ads")
@@ -0,0 +1,44 @@
+from django.conf import settings
+from rest_framework.renderers import BrowsableAPIRenderer, JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # optional: the stdlib encoder is used instead
+    orjson = None
+
+ORJSON_OPTIONS = (
+    # Dates and times go through DRF's encoder so the output matches JSONRenderer
+    orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS if orjson else 0
+)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer that encodes with orjson when it is installed: one pass in native
+    code producing UTF-8 bytes directly, with Persian text written as-is. Anything
+    orjson cannot encode (big integers, indented output for the browsable API)
+    falls back to the stock json.dumps path.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default, option=ORJSON_OPTIONS)
+        except TypeError:  # orjson.JSONEncodeError
+            return super().render(data, accepted_media_type, renderer_context)
+        # Same escaping of the JavaScript line terminators as JSONRenderer
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+def renderer_classes(json_renderer=JSONRenderer):
+    """`json_renderer`, plus the browsable API only while DEBUG is on."""
+    return [json_renderer, BrowsableAPIRenderer] if settings.DEBUG else [json_renderer]
+
+
+# For the large list endpoints (active ads, ad listing, saved ads)
+FAST_RENDERER_CLASSES = renderer_classes(FastJSONRenderer)
@@ -0,0 +1,161 @@
+import hashlib
+import os
+import threading
+import time
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import default_storage
+from django.http import Http404
+from django.urls import reverse
+from django.views.decorators.http import require_safe
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from utils.media import send_file
+
+RENDITION_WIDTHS = (160, 480, 1080)
+# url extension -> (PIL format, content type)
+RENDITION_FORMATS = {
+    'webp': ('WEBP', 'image/webp'),
+    'jpg': ('JPEG', 'image/jpeg'),
+}
+RENDITION_QUALITY = 75
+# Hits refresh a file's mtime (the LRU clock) at most this often
+TOUCH_INTERVAL = 3600
+
+
+class RenditionCache:
+    """
+    Disk cache of resized variants keyed by (source name, width, format). Sources
+    are immutable uploads, so a cached file never goes stale; when the cache grows
+    past `max_bytes` the least recently used files are deleted down to 90%.
+    """
+
+    def __init__(self, root, max_bytes):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._size = None
+
+    def path_for(self, name, width, fmt):
+        key = hashlib.sha1(name.encode()).hexdigest()
+        return os.path.join(self.root, str(width), key[:2], f'{key}.{fmt}')
+
+    def get(self, name, width, fmt):
+        """Absolute path of the rendition, generating it on a miss."""
+        path = self.path_for(name, width, fmt)
+        try:
+            mtime = os.stat(path).st_mtime
+        except FileNotFoundError:
+            return self.generate(name, width, fmt, path)
+        now = time.time()
+        if now - mtime > TOUCH_INTERVAL:
+            os.utime(path, (now, now))
+        return path
+
+    def generate(self, name, width, fmt, path):
+        try:
+            source = default_storage.open(name, 'rb')
+        except (FileNotFoundError, SuspiciousFileOperation):
+            raise Http404("Image not found")
+
+        with source:
+            try:
+                img = Image.open(source)
+                # Let the JPEG decoder downscale while decoding instead of loading every pixel
+                img.draft('RGB', (width, width))
+                img = ImageOps.exif_transpose(img)
+            except (UnidentifiedImageError, OSError):
+                raise Http404("Not an image")
+            if img.mode not in ('RGB', 'L'):
+                img = img.convert('RGB')
+            img.thumbnail((width, width * 10))
+
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+            img.save(tmp_path, format=RENDITION_FORMATS[fmt][0], quality=RENDITION_QUALITY)
+            os.replace(tmp_path, path)
+
+        self._grow(os.path.getsize(path))
+        return path
+
+    def _grow(self, size):
+        with self._lock:
+            if self._size is None:
+                self._size = self.disk_usage()
+            else:
+                self._size += size
+            over_budget = self._size > self.max_bytes
+        if over_budget:
+            self.evict()
+
+    def disk_usage(self):
+        return sum(entry.stat().st_size for entry in self._entries())
+
+    def _entries(self):
+        stack = [self.root]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif not entry.name.endswith('.tmp'):
+                            yield entry
+            except FileNotFoundError:
+                continue
+
+    def evict(self, target_bytes=None):
+        """Delete least recently used renditions until the cache fits; returns (files, bytes) freed."""
+        target_bytes = int(self.max_bytes * 0.9) if target_bytes is None else target_bytes
+        files = []
+        for entry in self._entries():
+            stat = entry.stat()
+            files.append((stat.st_mtime, stat.st_size, entry.path))
+        files.sort()
+        total = sum(size for _, size, _ in files)
+        removed = freed = 0
+        for _, size, path in files:
+            if total - freed <= target_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            removed += 1
+            freed += size
+        with self._lock:
+            self._size = total - freed
+        return removed, freed
+
+
+@lru_cache(maxsize=None)
+def get_rendition_cache():
+    return RenditionCache(settings.RENDITION_CACHE_ROOT, settings.RENDITION_CACHE_MAX_BYTES)
+
+
+def srcset(image, request=None):
+    """{'webp': 'url 160w, url 480w, ...', 'jpg': ...} for an ImageField value, or None when empty."""
+    if not image:
+        return None
+    result = {}
+    for fmt in RENDITION_FORMATS:
+        candidates = []
+        for width in RENDITION_WIDTHS:
+            url = reverse('rendition', args=[width, fmt, image.name])
+            if request is not None:
+                url = request.build_absolute_uri(url)
+            candidates.append(f'{url} {width}w')
+        result[fmt] = ', '.join(candidates)
+    return result
+
+
+@require_safe
+def rendition(request, width, fmt, name):
+    if width not in RENDITION_WIDTHS or fmt not in RENDITION_FORMATS:
+        raise Http404("Unknown rendition")
+    cache = get_rendition_cache()
+    path = cache.get(name, width, fmt)
+    # Renditions of an immutable upload never change
+    return send_file(request, cache.root, os.path.relpath(path, cache.root), settings.RENDITION_ACCEL_PREFIX, immutable=True)
@@ -1,34 +1,153 @@
 import requests
 import logging
 
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from utils.http_client import get_client
+
 # تنظیم لاگ برای دیباگ
 logger = logging.getLogger(__name__)
 
 
-def send_verification_sms(phone_number, code):
-    api_key = "34673075556F7669507A552F5A6F616B37676C2F6E6364346F784D396D7777474E796C784C76763577346B3D"  # کلید API کاوه‌نگار رو اینجا بذار
-    url = f"https://api.kavenegar.com/v1/{api_key}/sms/send.json"
+class SmsError(Exception):
+    def __init__(self, message, remaining=None):
+        super().__init__(message)
+        # Numbers a bulk send did not reach before failing
+        self.remaining = remaining
+
+
+class SmsProvider:
+    name = None
+    bulk_size = 1
+
+    def send(self, phone_number, text):
+        raise NotImplementedError
+
+    def send_bulk(self, phone_numbers, text):
+        """Send the same text to many numbers, in as few provider calls as the API allows."""
+        for start in range(0, len(phone_numbers), self.bulk_size):
+            try:
+                self._send_many(phone_numbers[start:start + self.bulk_size], text)
+            except SmsError as e:
+                e.remaining = phone_numbers[start:]
+                raise
+
+    def _send_many(self, phone_numbers, text):
+        for phone_number in phone_numbers:
+            self.send(phone_number, text)
 
-    # مطمئن شو که شماره با 09 شروع می‌شه
-    if not phone_number.startswith("09"):
-        phone_number = "0" + phone_number.lstrip("+98")
 
-    payload = {
-        "receptor": phone_number,
-        "message": f"کد تأیید شما: {code}"
-    }
+def provider_client(name, base_url):
+    return get_client(name, base_url, timeout=settings.SMS_HTTP_TIMEOUT, pool_size=settings.SMS_HTTP_POOL_SIZE)
+
+
+class KavenegarProvider(SmsProvider):
+    name = 'kavenegar'
+    bulk_size = 200
+
+    @staticmethod
+    def normalize_phone_number(phone_number):
+        # مطمئن شو که شماره با 09 شروع می‌شه
+        if not phone_number.startswith("09"):
+            phone_number = "0" + phone_number.lstrip("+98")
+        return phone_number
+
+    def send(self, phone_number, text):
+        self._send_many([phone_number], text)
+
+    def _send_many(self, phone_numbers, text):
+        client = provider_client(self.name, settings.KAVENEGAR_BASE_URL)
+        payload = {
+            "receptor": ",".join(self.normalize_phone_number(phone_number) for phone_number in phone_numbers),
+            "message": text
+        }
+
+        try:
+            response = client.post(f"{settings.KAVENEGAR_API_KEY}/sms/send.json", data=payload)
+        except requests.exceptions.RequestException as e:
+            logger.error(f"خطا در اتصال به کاوه‌نگار: {str(e)}")
+            raise SmsError(f"خطا در اتصال به کاوه‌نگار: {str(e)}")
 
-    try:
-        response = requests.post(url, data=payload, timeout=10)
-        logger.info(f"درخواست به کاوه‌نگار: {payload}")
         logger.info(f"پاسخ کاوه‌نگار: {response.status_code} - {response.text}")
+        if response.status_code != 200:
+            try:
+                error_message = response.json().get("return", {}).get("message", "خطای ناشناخته")
+            except ValueError:
+                error_message = "خطای ناشناخته"
+            raise SmsError(f"خطا در ارسال پیامک: {response.status_code} - {error_message}")
+
 
-        if response.status_code == 200:
-            return True
-        else:
-            error_message = response.json().get("return", {}).get("message", "خطای ناشناخته")
-            raise Exception(f"خطا در ارسال پیامک: {response.status_code} - {error_message}")
+class MelipayamakProvider(SmsProvider):
+    name = 'melipayamak'
+    bulk_size = 100
 
-    except requests.exceptions.RequestException as e:
-        logger.error(f"خطا در اتصال به کاوه‌نگار: {str(e)}")
-        raise Exception(f"خطا در اتصال به کاوه‌نگار: {str(e)}")
\ No newline at end of file
+    def send(self, phone_number, text):
+        self._send_many([phone_number], text)
+
+    def _send_many(self, phone_numbers, text):
+        # Same REST call as melipayamak.Api().sms().send, over the shared keep-alive session
+        client = provider_client(self.name, settings.MELIPAYAMAK_BASE_URL)
+        data = {
+            'username': settings.MELIPAYAMAK_USERNAME,
+            'password': settings.MELIPAYAMAK_PASSWORD,
+            'to': ','.join(phone_numbers),
+            'from': settings.MELIPAYAMAK_FROM,
+            'text': text,
+            'isFlash': False,
+        }
+        try:
+            response = client.post('SendSMS', data=data).json()
+        except (requests.exceptions.RequestException, ValueError) as e:
+            raise SmsError(f"Meli Payamak error: {str(e)}")
+
+        logger.info(f"Meli Payamak response for {data['to']}: {response}")
+        if isinstance(response, dict) and response.get('RetStatus') != 1:
+            raise SmsError(f'خطا در ارسال پیامک: {response.get("StrRetStatus", "Unknown error")}')
+
+
+class FakeSmsProvider(SmsProvider):
+    """Offline provider for development and tests; keeps sent messages in memory."""
+    name = 'fake'
+    sent = []
+
+    def send(self, phone_number, text):
+        logger.info(f"Fake SMS to {phone_number}: {text}")
+        self.sent.append((phone_number, text))
+
+
+def get_providers():
+    return [import_string(path)() for path in settings.SMS_PROVIDERS]
+
+
+def send_with_failover(phone_number, text):
+    """Try each configured provider in order; return the name of the one that sent the message."""
+    errors = []
+    for provider in get_providers():
+        try:
+            provider.send(phone_number, text)
+            return provider.name
+        except SmsError as e:
+            logger.warning(f"SMS provider {provider.name} failed for {phone_number}: {e}")
+            errors.append(f"{provider.name}: {e}")
+    raise SmsError("; ".join(errors) or "No SMS provider configured")
+
+
+def send_bulk_with_failover(phone_numbers, text):
+    """Bulk variant of send_with_failover for batched notifications."""
+    errors = []
+    remaining = list(phone_numbers)
+    for provider in get_providers():
+        try:
+            provider.send_bulk(remaining, text)
+            return provider.name
+        except SmsError as e:
+            logger.warning(f"SMS provider {provider.name} failed for bulk send: {e}")
+            errors.append(f"{provider.name}: {e}")
+            remaining = e.remaining or remaining
+    raise SmsError("; ".join(errors) or "No SMS provider configured", remaining=remaining)
+
+
+def send_verification_sms(phone_number, code):
+    send_with_failover(phone_number, f"کد تأیید شما: {code}")
+    return True
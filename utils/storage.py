@@ -0,0 +1,100 @@
+import hashlib
+import os
+import uuid
+from collections import Counter
+
+from django.core.files.storage import FileSystemStorage
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+# Content-addressed uploads live under this prefix: files/ab/cd/abcd...<ext>
+CONTENT_PREFIX = 'files'
+
+
+def content_hash(content):
+    digest = hashlib.sha256()
+    content.seek(0)
+    for chunk in content.chunks():
+        digest.update(chunk)
+    content.seek(0)
+    return digest.hexdigest()
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    FileSystemStorage that names every saved file by the SHA-256 of its content.
+    Saving bytes that are already stored only adds a reference (core.StoredFile);
+    delete() drops one reference and removes the file with the last one. Names
+    never change content, so they can be cached as immutable.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        # _save() picks the final name from the content
+        return name
+
+    def hashed_name(self, name, digest):
+        extension = os.path.splitext(name)[1].lower()
+        return f"{CONTENT_PREFIX}/{digest[:2]}/{digest[2:4]}/{digest}{extension}"
+
+    def _save(self, name, content):
+        from core.models import StoredFile
+
+        name = self.hashed_name(name, content_hash(content))
+        with transaction.atomic():
+            # Take the reference first: a concurrent delete() of the last
+            # reference holds this row lock until its file removal is committed
+            if not StoredFile.objects.filter(name=name).update(ref_count=F('ref_count') + 1):
+                try:
+                    with transaction.atomic():
+                        StoredFile.objects.create(name=name, size=content.size, ref_count=1)
+                except IntegrityError:
+                    StoredFile.objects.filter(name=name).update(ref_count=F('ref_count') + 1)
+            if not self.exists(name):
+                # Write under a unique name and rename, so a reader never sees a partial file
+                tmp_name = super()._save(f"{name}.{uuid.uuid4().hex}.tmp", content)
+                os.replace(self.path(tmp_name), self.path(name))
+        return name
+
+    def delete(self, name):
+        """Drop one reference to `name`; the file itself goes with the last one."""
+        from core.models import StoredFile
+
+        if not name:
+            return
+        with transaction.atomic():
+            stored = StoredFile.objects.select_for_update().filter(name=name).first()
+            if stored is None:
+                # Uploaded before content addressing; it has exactly one owner
+                super().delete(name)
+            elif stored.ref_count > 1:
+                StoredFile.objects.filter(pk=stored.pk).update(ref_count=F('ref_count') - 1)
+            else:
+                stored.delete()
+                super().delete(name)
+
+    def delete_many(self, names):
+        """delete() for a batch: one locking query and one update per distinct count instead of one per file."""
+        from core.models import StoredFile
+
+        counts = Counter(name for name in names if name)
+        if not counts:
+            return
+        with transaction.atomic():
+            stored = dict(
+                StoredFile.objects.select_for_update().filter(name__in=counts).values_list('name', 'ref_count')
+            )
+            released = [name for name, ref_count in stored.items() if ref_count <= counts[name]]
+            decrements = {}
+            for name, ref_count in stored.items():
+                if ref_count > counts[name]:
+                    decrements.setdefault(counts[name], []).append(name)
+            for amount, group in decrements.items():
+                StoredFile.objects.filter(name__in=group).update(ref_count=F('ref_count') - amount)
+            StoredFile.objects.filter(name__in=released).delete()
+            for name in released + [name for name in counts if name not in stored]:
+                super().delete(name)
+
+    def ref_count(self, name):
+        from core.models import StoredFile
+
+        return StoredFile.objects.filter(name=name).values_list('ref_count', flat=True).first() or 0